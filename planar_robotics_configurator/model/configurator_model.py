@@ -1,3 +1,6 @@
+import random
+import string
+
 from planar_robotics_configurator.model.config import Config
 from planar_robotics_configurator.model.environment.environment import Environment
 from planar_robotics_configurator.model.environment.mover_preset import MoverPreset
@@ -12,6 +15,8 @@ class ConfiguratorModel:
     Thus, it can be used at any position at the view and always has every information.
     """
     instance = None
+    # Resolution of the mover preset dimensions and mass in the preset index.
+    MOVER_PRESET_RESOLUTION = 1e-6
 
     def __init__(self):
         if self.__class__.instance is not None:
@@ -19,6 +24,9 @@ class ConfiguratorModel:
         self.__class__.instance = self
         self.environments: list[Environment] = []
         self.mover_presets: list[MoverPreset] = []
+        # First preset for every quantized (width, length, height, mass), see get_mover_preset_key.
+        self.mover_preset_index: dict[tuple[int, int, int, int], MoverPreset] = {}
+        self.num_indexed_mover_presets = 0
         self.algorithms: list[Algorithm] = []
         self.algorithm_configurations: list[AlgorithmConfiguration] = []
 
@@ -31,4 +39,52 @@ class ConfiguratorModel:
         for algorithm in config.algorithms.values():
             self.algorithms.append(ConfigAlgorithm.to_algorithm(algorithm))
         for preset in config.mover_presets:
-            self.mover_presets.append(preset)
+            self.add_mover_preset(preset)
+
+    @classmethod
+    def get_mover_preset_key(cls, width, length, height, mass) -> tuple[int, int, int, int]:
+        """
+        Returns the key of the mover preset index. The values are quantized to MOVER_PRESET_RESOLUTION, thus nearly
+        equal floats result in the same key.
+        """
+        return (round(width / cls.MOVER_PRESET_RESOLUTION), round(length / cls.MOVER_PRESET_RESOLUTION),
+                round(height / cls.MOVER_PRESET_RESOLUTION), round(mass / cls.MOVER_PRESET_RESOLUTION))
+
+    def add_mover_preset(self, preset: MoverPreset):
+        """
+        Adds a mover preset and inserts it into the mover preset index.
+        """
+        self.mover_presets.append(preset)
+        self.update_mover_preset_index()
+
+    def update_mover_preset_index(self):
+        """
+        Inserts presets which were appended to mover_presets directly into the mover preset index.
+        Rebuilds the index if presets were removed.
+        """
+        if self.num_indexed_mover_presets > len(self.mover_presets):
+            self.mover_preset_index.clear()
+            self.num_indexed_mover_presets = 0
+        for preset in self.mover_presets[self.num_indexed_mover_presets:]:
+            key = self.get_mover_preset_key(preset.width, preset.length, preset.height, preset.mass)
+            self.mover_preset_index.setdefault(key, preset)
+        self.num_indexed_mover_presets = len(self.mover_presets)
+
+    def find_mover_preset(self, width, length, height, mass) -> MoverPreset | None:
+        """
+        Returns the first mover preset with the given (quantized) dimensions and mass or None if there is none.
+        """
+        self.update_mover_preset_index()
+        return self.mover_preset_index.get(self.get_mover_preset_key(width, length, height, mass))
+
+    def get_or_create_mover_preset(self, width, length, height, mass) -> MoverPreset:
+        """
+        Returns the mover preset with the given dimensions and mass.
+        Creates and adds a preset with a random name if there is none.
+        """
+        preset = self.find_mover_preset(width, length, height, mass)
+        if preset is None:
+            preset = MoverPreset(name=''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(10)),
+                                 width=width, length=length, height=height, mass=mass)
+            self.add_mover_preset(preset)
+        return preset
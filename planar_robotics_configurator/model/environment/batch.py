@@ -0,0 +1,150 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import hydra_zen
+import mujoco
+
+from planar_robotics_configurator.model.environment.environment import Environment
+from planar_robotics_configurator.model.environment.snapshot import load_snapshot_environment
+
+
+@dataclass(frozen=False)
+class BuildResult:
+    """
+    Result of building one environment of a batch.
+    :param name: Name of the environment.
+    :param source: Path of the config or snapshot the environment is loaded from, None for environment objects.
+    :param load_time: Time (s) of loading the environment from the source.
+    :param build_time: Time (s) of creating the BasicPlanarRoboticsEnv, which includes the MuJoCo compilation.
+    :param mjcf: Complete MJCF of the compiled model, None if the build failed.
+    :param error: Description of the exception of a failed build, None if the build succeeded.
+    """
+    name: str
+    source: str | None
+    load_time: float = 0.0
+    build_time: float = 0.0
+    mjcf: str | None = None
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def load_environment(file: str) -> Environment:
+    """
+    Loads an environment from an exported YAML config or a snapshot (.npz). The name is the file name without suffix.
+    """
+    name = os.path.splitext(os.path.basename(file))[0]
+    if file.endswith(".npz"):
+        return load_snapshot_environment(name, file)
+    return Environment.from_config(name, hydra_zen.load_from_yaml(file)["env"])
+
+
+def save_last_mjcf(model: mujoco.MjModel) -> str:
+    """
+    Returns the MJCF of the model which was compiled last in this process, see mujoco.mj_saveLastXML.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xml")
+    os.close(fd)
+    try:
+        mujoco.mj_saveLastXML(path, model)
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def create_result(item: Environment | str, error: Exception | None = None) -> BuildResult:
+    """
+    Creates the result of an item before it is loaded, see build_environment.
+    """
+    result = BuildResult(name=item.name if isinstance(item, Environment) else os.path.basename(item),
+                         source=item if isinstance(item, str) else None)
+    if error is not None:
+        result.error = "".join(traceback.format_exception_only(error)).strip()
+    return result
+
+
+def build_environment(item: Environment | str) -> BuildResult:
+    """
+    Loads and builds one environment without viewer and closes it afterward. Exceptions are stored in the result.
+    :param item: Environment or path of a config or snapshot, see load_environment.
+    """
+    result = create_result(item)
+    try:
+        start = time.perf_counter()
+        environment = item if isinstance(item, Environment) else load_environment(item)
+        result.name = environment.name
+        result.load_time = time.perf_counter() - start
+        start = time.perf_counter()
+        env = environment.create_basic_planar_robotics_env(passive_viewer=False)
+        result.build_time = time.perf_counter() - start
+        try:
+            result.mjcf = save_last_mjcf(env.model)
+        finally:
+            env.close()
+    except Exception as e:
+        result.error = "".join(traceback.format_exception_only(e)).strip()
+    return result
+
+
+def build_environments(items: list[Environment | str], max_workers: int | None = None) -> list[BuildResult]:
+    """
+    Builds the environments in parallel across a pool of processes, e.g. to validate many exported layouts.
+    The processes are spawned, thus they share no state such as OpenGL contexts with the calling process.
+    Environments are sent to the processes as copies, see Environment.copy.
+    :param items: Environments or paths of configs or snapshots, see load_environment.
+    :param max_workers: Number of processes, defaults to the number of CPUs.
+    :return: Result of every item in the order of the items.
+    """
+    items = [item.copy() if isinstance(item, Environment) else item for item in items]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(build_environment, item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The process of the item crashed, e.g. in MuJoCo, or the item could not be sent to it.
+                results.append(create_result(item, e))
+    return results
+
+
+def main(args=None) -> int:
+    """
+    Builds the given environment configs and snapshots in parallel and prints a line per environment.
+    Optionally writes the MJCF of every built environment into a directory.
+    :return: 0 if all environments are built, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Builds planar robotics environments in parallel.")
+    parser.add_argument("files", nargs="+", help="Exported YAML configs or snapshots (.npz).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes, defaults to the CPUs.")
+    parser.add_argument("--mjcf-dir", default=None, help="Directory for the MJCF of the built environments.")
+    args = parser.parse_args(args)
+    start = time.perf_counter()
+    results = build_environments(args.files, max_workers=args.workers)
+    for result in results:
+        if result.success:
+            print(f"OK    {result.source}: load {result.load_time:.3f} s, build {result.build_time:.3f} s")
+        else:
+            print(f"ERROR {result.source}: {result.error}")
+        if result.mjcf is not None and args.mjcf_dir is not None:
+            os.makedirs(args.mjcf_dir, exist_ok=True)
+            file_name = os.path.splitext(os.path.basename(result.source))[0] + ".xml"
+            with open(os.path.join(args.mjcf_dir, file_name), "w", encoding="utf-8") as f:
+                f.write(result.mjcf)
+    num_failed = sum(not result.success for result in results)
+    print(f"{len(results) - num_failed}/{len(results)} environments built in {time.perf_counter() - start:.1f} s")
+    return 1 if num_failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
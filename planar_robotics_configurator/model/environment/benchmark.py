@@ -0,0 +1,146 @@
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import mujoco
+import numpy as np
+
+from planar_robotics_configurator.model.environment.batch import load_environment
+from planar_robotics_configurator.model.environment.environment import Environment
+
+# Percentiles of the wall-clock time per step which are reported.
+STEP_TIME_PERCENTILES = [50, 90, 99]
+
+
+@dataclass(frozen=False)
+class BenchmarkResult:
+    """
+    Simulation throughput of an environment.
+    :param name: Name of the environment.
+    :param num_steps: Number of simulated steps.
+    :param compile_time: Time (s) of creating the environment, which includes generating and compiling the model.
+    :param steps_per_second: Simulated steps per second of wall-clock time.
+    :param step_times: Wall-clock time (s) per step by percentile, see STEP_TIME_PERCENTILES.
+    :param peak_memory: Peak resident memory (bytes) of the process which ran the benchmark, None if it is not
+    available on the platform. Includes everything the process did before, see benchmark_environment.
+    """
+    name: str
+    num_steps: int
+    compile_time: float
+    steps_per_second: float
+    step_times: dict[int, float]
+    peak_memory: int | None
+
+    def to_text(self) -> str:
+        """
+        Returns a one-line summary of the result.
+        """
+        step_times = ", ".join(f"p{percentile} {step_time * 1000:.3f} ms"
+                               for percentile, step_time in self.step_times.items())
+        peak_memory = f"{self.peak_memory / 2 ** 20:.0f} MiB" if self.peak_memory is not None else "unknown"
+        return (f"{self.name}: {self.steps_per_second:.0f} steps/s ({self.num_steps} steps), step {step_times}, "
+                f"compile {self.compile_time:.3f} s, peak memory {peak_memory}")
+
+
+def get_peak_memory() -> int | None:
+    """
+    Returns the peak resident memory (bytes) of the process, None if the platform has no resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux.
+    return peak_memory if sys.platform == "darwin" else peak_memory * 1024
+
+
+def create_random_step(env, seed: int | None):
+    """
+    Returns a function simulating one step with a random action.
+    Environments with a gymnasium action space are stepped by env.step, otherwise the MuJoCo model is stepped with
+    random controls in the control range of the actuators.
+    """
+    if hasattr(env, "action_space") and hasattr(env, "step"):
+        env.action_space.seed(seed)
+
+        def step():
+            _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+            if terminated or truncated:
+                env.reset()
+
+        return step
+    rng = np.random.default_rng(seed)
+    ctrl_range = np.asarray(env.model.actuator_ctrlrange).reshape(-1, 2)
+    # Actuators without limited control range get controls in [-1, 1].
+    low = np.where(ctrl_range[:, 0] < ctrl_range[:, 1], ctrl_range[:, 0], -1)
+    high = np.where(ctrl_range[:, 0] < ctrl_range[:, 1], ctrl_range[:, 1], 1)
+
+    def step():
+        env.data.ctrl[:] = rng.uniform(low, high)
+        mujoco.mj_step(env.model, env.data)
+
+    return step
+
+
+def benchmark_environment(environment: Environment, num_steps: int = 1000, seed: int | None = None) -> BenchmarkResult:
+    """
+    Builds the environment without viewer and measures the time of simulating steps with random actions.
+    The peak memory is the maximum of the whole process, thus it is only meaningful if the benchmark runs in a new
+    process, see benchmark_file.
+    :param environment: Environment to benchmark.
+    :param num_steps: Number of simulated steps.
+    :param seed: Seed of the random actions.
+    """
+    assert num_steps > 0
+    start = time.perf_counter()
+    env = environment.create_basic_planar_robotics_env(passive_viewer=False)
+    compile_time = time.perf_counter() - start
+    try:
+        if hasattr(env, "reset"):
+            env.reset(seed=seed)
+        step = create_random_step(env, seed)
+        step_times = np.empty(num_steps, dtype=np.float64)
+        for idx in range(num_steps):
+            start = time.perf_counter()
+            step()
+            step_times[idx] = time.perf_counter() - start
+    finally:
+        env.close()
+    percentiles = np.percentile(step_times, STEP_TIME_PERCENTILES).tolist()
+    return BenchmarkResult(name=environment.name, num_steps=num_steps, compile_time=compile_time,
+                           steps_per_second=num_steps / step_times.sum(),
+                           step_times=dict(zip(STEP_TIME_PERCENTILES, percentiles)),
+                           peak_memory=get_peak_memory())
+
+
+def benchmark_file(file: str, num_steps: int = 1000, seed: int | None = None) -> BenchmarkResult:
+    """
+    Loads an environment config or snapshot and benchmarks it, see load_environment and benchmark_environment.
+    """
+    return benchmark_environment(load_environment(file), num_steps=num_steps, seed=seed)
+
+
+def main(args=None) -> int:
+    """
+    Benchmarks the given environment configs and snapshots one after another and prints a line per environment.
+    Every file is benchmarked in a new spawned process, thus the peak memory of a file does not include the memory of
+    the files benchmarked before.
+    """
+    parser = argparse.ArgumentParser(description="Measures the simulation throughput of planar robotics environments.")
+    parser.add_argument("files", nargs="+", help="Exported YAML configs or snapshots (.npz).")
+    parser.add_argument("--steps", type=int, default=1000, help="Number of simulated steps per environment.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random actions.")
+    args = parser.parse_args(args)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as executor:
+        for file in args.files:
+            print(executor.submit(benchmark_file, file, args.steps, args.seed).result().to_text())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
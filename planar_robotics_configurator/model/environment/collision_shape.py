@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=True)
 class CollisionShape:
     """
     Represents the collision shape of a mover.
-    Abstract base class for all collision shapes.
+    Abstract base class for all collision shapes. Collision shapes are immutable, a changed shape is set as new
+    collision shape of the mover, since movers of a MoverTable store the values of their shape in columns.
     """
 
     def to_config(self):
@@ -16,7 +17,7 @@ class CollisionShape:
         raise NotImplementedError()
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=True)
 class CircleCollisionShape(CollisionShape):
     """
     Represents the collision shape of a circle.
@@ -37,7 +38,7 @@ class CircleCollisionShape(CollisionShape):
         )
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=True)
 class BoxCollisionShape(CollisionShape):
     """
     Represents the collision shape of a box.
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+
+from gymnasium_planar_robotics.envs.basic_envs import BasicPlanarRoboticsEnv
+
+from planar_robotics_configurator.model.environment.environment import Environment
+
+
+class EnvironmentCache:
+    """
+    Least recently used cache of built simulation environments, keyed by the content hash of the environment.
+    Building an environment generates the MJCF and compiles the MuJoCo model, which is skipped for unchanged
+    environments. The environments are built without viewer, thus they only hold the compiled model and its data and
+    a viewer can be launched for them whenever it is needed.
+    The cache can be used from multiple threads, environments are built outside the lock. Environments which are
+    removed from the cache are returned to the caller instead of being closed, thus they are closed by the thread
+    which uses them, e.g. the main thread which renders them.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        """
+        :param max_entries: Maximal number of cached environments.
+        """
+        self.max_entries = max_entries
+        self.envs: OrderedDict[str, BasicPlanarRoboticsEnv] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.envs)
+
+    def get(self, environment: Environment,
+            content_hash: str | None = None) -> tuple[BasicPlanarRoboticsEnv, list[BasicPlanarRoboticsEnv]]:
+        """
+        Returns the built simulation environment of the environment, builds it if no environment with the same content
+        is cached.
+        :param environment: Environment to build.
+        :param content_hash: Content hash of the environment if it is already known, see Environment.content_hash.
+        :return: The environment and the environments which are no longer cached and have to be closed by the caller.
+        """
+        key = content_hash if content_hash is not None else environment.content_hash()
+        with self.lock:
+            env = self.envs.get(key)
+            if env is not None:
+                self.hits += 1
+                self.envs.move_to_end(key)
+                return env, []
+            self.misses += 1
+        env = environment.create_basic_planar_robotics_env(passive_viewer=False)
+        with self.lock:
+            if key in self.envs:
+                # Built concurrently by another thread, keep the cached environment.
+                return self.envs[key], [env]
+            self.envs[key] = env
+            evicted = []
+            while len(self.envs) > self.max_entries:
+                evicted.append(self.envs.popitem(last=False)[1])
+        return env, evicted
+
+    def clear(self) -> None:
+        """
+        Closes and removes all cached environments and resets the hit and miss counts.
+        Must be called by the thread which uses the environments.
+        """
+        with self.lock:
+            envs = list(self.envs.values())
+            self.envs.clear()
+            self.hits = 0
+            self.misses = 0
+        for env in envs:
+            env.close()
+
+
+# Cache of the environments built for previews.
+environment_cache = EnvironmentCache()
@@ -1,10 +1,19 @@
-from dataclasses import dataclass, field
+import copy
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field, fields
+
 import numpy as np
 from gymnasium_planar_robotics.envs.basic_envs import BasicPlanarRoboticsEnv
 
 from planar_robotics_configurator.model.environment.mover import Mover
+from planar_robotics_configurator.model.environment.mover_table import MoverTable
 from planar_robotics_configurator.model.environment.object import Object, RefObject, CubeObject, BallObject
+from planar_robotics_configurator.model.environment.tile_storage import TileStorage, create_tile_storage
+from planar_robotics_configurator.model.environment.tiles_codec import encode_tiles, decode_tiles
 from planar_robotics_configurator.model.environment.working_station import WorkingStation
+from planar_robotics_configurator.model.environment.xml_cache import xml_parse_cache
 
 
 @dataclass(frozen=False)
@@ -14,7 +23,7 @@ class Environment:
     :param name: Name of the environment. Used to identify the environment.
     :param num_width: Width number of tiles for the environment in x direction.
     :param num_length: Length number of tiles for the environment in y direction.
-    :param tiles: [num_width, num_length] Array of int. 1 for a tile at the position, 0 else
+    :param tiles: [num_width, num_length] Array of int. 1 for a tile at the position, 0 else. Stored in tile_data.
     :param tile_width: width (cm) of the tiles in the environment in x direction.
     :param tile_length: length (cm) of the tiles in the environment in y direction.
     :param tile_height: height (cm) of the tiles in the environment in z direction.
@@ -27,14 +36,16 @@ class Environment:
     :param learn_jerk: Should the jerk be learned.
     :param min_friction: Minimal friction.
     :param max_friction: Max friction.
-    :param movers: List of movers in the environment.
+    :param movers: Movers in the environment, stored column-wise in a MoverTable. A list is converted to a table.
     :param working_stations: List of working stations in the environment.
     :param objects: List of objects in the environment.
+    :param tile_storage: How the tiles are stored, "int", "uint8" or "bool" for an array of this dtype and "packed"
+    for one bit per tile. See create_tile_storage.
     """
     name: str
     num_width: int
     num_length: int
-    tiles: np.ndarray = field(init=False)
+    tile_data: TileStorage = field(init=False, repr=False, compare=False)
     tile_width: float
     tile_length: float
     tile_height: float
@@ -53,55 +64,72 @@ class Environment:
     offset_wall: float
     min_friction: float
     max_friction: float
-    movers: list[Mover] = field(default_factory=list)
+    movers: MoverTable = field(default_factory=MoverTable)
     working_stations: list[WorkingStation] = field(default_factory=list)
     objects: list[Object] = field(default_factory=list)
+    tile_storage: str = "int"
 
     def __post_init__(self):
+        if not isinstance(self.movers, MoverTable):
+            self.movers = MoverTable(self.movers)
         self.init_tiles()
 
+    @property
+    def tiles(self) -> np.ndarray:
+        """
+        [num_width, num_length] array of the tiles. Only for dense tile storages, changes to the array are stored.
+        """
+        return self.tile_data.to_array()
+
+    @tiles.setter
+    def tiles(self, tiles: np.ndarray):
+        self.tile_data.set_array(tiles)
+
     def init_tiles(self):
         """
         Creates the tiles of the environment.
         Sets all tiles to zero, which represents a not existing tile.
         """
-        self.tiles = np.zeros((self.num_width, self.num_length), dtype=int)
+        self.tile_data = create_tile_storage(self.tile_storage, self.num_width, self.num_length)
 
     def update_tiles(self):
         """
-        Updates the tiles array. Expands or slices the current tiles to create an array matching the needed size.
+        Updates the tiles array. Allocates the tiles matching the needed size once and copies the overlapping tiles.
         """
-        if self.num_width != self.tiles.shape[0]:
-            if self.num_width < self.tiles.shape[0]:
-                self.tiles = self.tiles[:self.num_width, :]
-            else:
-                self.tiles = np.concatenate(
-                    (self.tiles, np.zeros((self.num_width - self.tiles.shape[0],
-                                           self.tiles.shape[1]), dtype=int)), axis=0)
-        if self.num_length != self.tiles.shape[1]:
-            if self.num_length < self.tiles.shape[1]:
-                self.tiles = self.tiles[:, :self.num_length]
-            else:
-                self.tiles = np.concatenate((
-                    self.tiles, np.zeros((self.tiles.shape[0],
-                                          self.num_length - self.tiles.shape[1]), dtype=int)), axis=1)
+        self.tile_data.resize(self.num_width, self.num_length)
 
     def set_size(self, num_width: int, num_length: int):
         """
         Sets the size of the environment and updates the tiles array.
+        Removes movers, working stations and objects outside the new size.
         """
         self.num_width = num_width
         self.num_length = num_length
-        self.movers[:] = [m for m in self.movers if m.x < num_width and m.y < num_length]
+        self.movers.keep((self.movers.x < num_width) & (self.movers.y < num_length))
+        mask = self.get_inside_mask(self.working_stations)
+        self.working_stations[:] = [entity for entity, inside in zip(self.working_stations, mask) if inside]
+        mask = self.get_inside_mask(self.objects)
+        self.objects[:] = [entity for entity, inside in zip(self.objects, mask) if inside]
         self.update_tiles()
 
+    def get_inside_mask(self, entities: list[WorkingStation | Object]) -> list[bool]:
+        """
+        Checks which working stations or objects are positioned inside the environment.
+        :param entities: Working stations or objects.
+        :return: True for every entity with a x and y position inside the environment.
+        """
+        positions = np.array([entity.position[:2] for entity in entities], dtype=np.float64).reshape(-1, 2)
+        mask = ((positions >= 0).all(axis=1) & (positions[:, 0] < self.num_width * self.tile_width)
+                & (positions[:, 1] < self.num_length * self.tile_length))
+        return mask.tolist()
+
     def get_tile(self, x, y) -> bool:
         """
         Gets a tile at position x, y in the tile coordinate-system.
         :param x: x coordinate of the tile.
         :param y: y coordinate of the tile.
         """
-        return self.tiles[x, y]
+        return self.tile_data.get(x, y)
 
     def set_tile(self, x, y, value):
         """
@@ -111,7 +139,124 @@ class Environment:
         :param value: value of the tile, this value should only be 0 for not existing and 1 for existing tile.
         """
         assert value in [0, 1]
-        self.tiles[x, y] = value
+        self.tile_data.set((x, y), value)
+
+    def set_tiles(self, xs, ys, value):
+        """
+        Sets the value of multiple tiles at once in the tile coordinate-system.
+        :param xs: x coordinates of the tiles.
+        :param ys: y coordinates of the tiles, same length as xs.
+        :param value: value of the tiles, this value should only be 0 for not existing and 1 for existing tile.
+        """
+        assert value in [0, 1]
+        self.tile_data.set((xs, ys), value)
+
+    def set_tiles_area(self, x_start, y_start, x_end, y_end, value):
+        """
+        Sets the value of all tiles in the area [x_start, x_end) x [y_start, y_end) in the tile coordinate-system.
+        :param x_start: first x coordinate of the area.
+        :param y_start: first y coordinate of the area.
+        :param x_end: x coordinate after the area.
+        :param y_end: y coordinate after the area.
+        :param value: value of the tiles, this value should only be 0 for not existing and 1 for existing tile.
+        """
+        assert value in [0, 1]
+        self.tile_data.set((slice(x_start, x_end), slice(y_start, y_end)), value)
+
+    def get_tiles_area(self, x_start, y_start, x_end, y_end) -> np.ndarray:
+        """
+        Returns the tiles in the area [x_start, x_end) x [y_start, y_end) in the tile coordinate-system without
+        reading or copying the other tiles. The returned array must not be changed.
+        """
+        return self.tile_data.get_area(x_start, y_start, x_end, y_end)
+
+    def fill_rect(self, x_start, y_start, x_end, y_end):
+        """
+        Places tiles in the area [x_start, x_end) x [y_start, y_end) in the tile coordinate-system.
+        """
+        self.set_tiles_area(x_start, y_start, x_end, y_end, 1)
+
+    def clear_rect(self, x_start, y_start, x_end, y_end):
+        """
+        Removes the tiles in the area [x_start, x_end) x [y_start, y_end) in the tile coordinate-system.
+        """
+        self.set_tiles_area(x_start, y_start, x_end, y_end, 0)
+
+    def apply_mask(self, mask: np.ndarray, value=1):
+        """
+        Sets the value of all tiles selected by a mask.
+        :param mask: [num_width, num_length] array of bool, True for the tiles which should be set.
+        :param value: value of the tiles, this value should only be 0 for not existing and 1 for existing tile.
+        """
+        assert value in [0, 1]
+        assert mask.shape == self.tile_data.shape
+        self.tile_data.set(mask.astype(bool), value)
+
+    def paste_tiles(self, layout: np.ndarray, x=0, y=0):
+        """
+        Pastes a layout of tiles with its first tile at position x, y in the tile coordinate-system.
+        Parts of the layout outside the environment are ignored.
+        :param layout: [width, length] array of int. 1 for a tile at the position, 0 else.
+        :param x: x coordinate of the first tile of the layout.
+        :param y: y coordinate of the first tile of the layout.
+        """
+        assert layout.ndim == 2 and np.all((layout == 0) | (layout == 1))
+        x_start, y_start = max(x, 0), max(y, 0)
+        x_end, y_end = min(x + layout.shape[0], self.num_width), min(y + layout.shape[1], self.num_length)
+        if x_start >= x_end or y_start >= y_end:
+            return
+        self.tile_data.set((slice(x_start, x_end), slice(y_start, y_end)),
+                           layout[x_start - x:x_end - x, y_start - y:y_end - y])
+
+    def invert_tiles(self):
+        """
+        Places tiles at all positions without a tile and removes all existing tiles.
+        """
+        self.tiles = 1 - self.tiles
+
+    def mirror(self, axis: int):
+        """
+        Mirrors the layout including movers, working stations and objects.
+        :param axis: 0 to mirror the x coordinates, 1 to mirror the y coordinates.
+        """
+        assert axis in [0, 1]
+        self.tiles = np.ascontiguousarray(np.flip(self.tiles, axis=axis))
+        if axis == 0:
+            size = self.num_width * self.tile_width
+            self.movers.x[:] = self.num_width - 1 - self.movers.x
+            for entity in self.working_stations + self.objects:
+                entity.position = (size - entity.position[0], entity.position[1], entity.position[2])
+        else:
+            size = self.num_length * self.tile_length
+            self.movers.y[:] = self.num_length - 1 - self.movers.y
+            for entity in self.working_stations + self.objects:
+                entity.position = (entity.position[0], size - entity.position[1], entity.position[2])
+
+    def rotate(self, k=1):
+        """
+        Rotates the layout including movers, working stations and objects by k times 90 degrees counterclockwise
+        in the tile array, see np.rot90. Swaps width and length of the environment, tiles, box collision shapes of
+        the movers and cube objects for odd k. The mover presets are shared with other movers and not changed.
+        :param k: number of rotations by 90 degrees.
+        """
+        k = k % 4
+        if k == 0:
+            return
+        self.tiles = np.ascontiguousarray(np.rot90(self.tiles, k))
+        for _ in range(k):
+            # The tile at (x, y) moves to (num_length - 1 - y, x).
+            size = self.num_length * self.tile_length
+            self.movers.x[:], self.movers.y[:] = self.num_length - 1 - self.movers.y, self.movers.x.copy()
+            for entity in self.working_stations + self.objects:
+                entity.position = (size - entity.position[1], entity.position[0], entity.position[2])
+            self.num_width, self.num_length = self.num_length, self.num_width
+            self.tile_width, self.tile_length = self.tile_length, self.tile_width
+        if k % 2 == 1:
+            shape_width, shape_length = self.movers.column("shape_width"), self.movers.column("shape_length")
+            shape_width[:], shape_length[:] = shape_length.copy(), shape_width.copy()
+            for object_instance in self.objects:
+                if isinstance(object_instance, CubeObject):
+                    object_instance.width, object_instance.length = object_instance.length, object_instance.width
 
     def create_basic_planar_robotics_env(self, passive_viewer=True) -> BasicPlanarRoboticsEnv:
         """
@@ -120,6 +265,7 @@ class Environment:
         custom_model_xml_strings = {
             "custom_outworldbody_xml_str": self.create_outworldbody_xml_str()
         }
+        preset_values = self.movers.get_preset_values()
         env = BasicPlanarRoboticsEnv(
             layout_tiles=self.tiles,
             num_movers=len(self.movers),
@@ -129,71 +275,123 @@ class Environment:
                                   ])
             },
             mover_params={
-                "size": np.array(list(map(lambda mover: [mover.preset.width / 2,
-                                                         mover.preset.length / 2,
-                                                         mover.preset.height / 2], self.movers)))
+                "size": preset_values[:, :3] / 2
             },
             table_height=self.table_height,
             initial_mover_zpos=self.initial_mover_zpos,
             std_noise=self.std_noise,
-            initial_mover_start_xy_pos=np.array(list(
-                map(lambda mover: [(mover.x + 0.5) * self.tile_width,
-                                   (mover.y + 0.5) * self.tile_length],
-                    self.movers))),
+            initial_mover_start_xy_pos=np.stack(((self.movers.x + 0.5) * self.tile_width,
+                                                 (self.movers.y + 0.5) * self.tile_length), axis=1),
             custom_model_xml_strings=custom_model_xml_strings,
             use_mj_passive_viewer=passive_viewer)
         return env
 
     def create_outworldbody_xml_str(self) -> str:
-        import tempfile
-        import xml.etree.ElementTree as ET
-        import os
-        mp_xml_str = ""
-        for working_station in self.working_stations:
-            dirname, basename = os.path.split(working_station.fileRef)
-            tmp = tempfile.NamedTemporaryFile(delete=False, prefix=basename, dir=dirname)
-            et = ET.parse(working_station.fileRef)
-            body = et.find("worldbody").find("body")
-            body.attrib["pos"] = (f'{working_station.position[0]} {working_station.position[1]} '
-                                  f'{working_station.position[2]}')
-            et.write(tmp.name)
-            mp_xml_str += f'\n\t<include file="{tmp.name}"/>'
+        """
+        Creates the MJCF of the working stations and objects which is inserted outside the worldbody of the model.
+        Referenced XML files are inlined without writing files: the shared elements, e.g. assets and defaults, are
+        added once per file with absolute file paths. The worldbody children of every instance are added to a single
+        worldbody and the actuators, sensors, contacts, equalities and tendons are added per instance, see
+        XmlParseCache.create_instance.
+        """
+        sections: dict[str, list[ET.Element]] = {}
+        instance_sections: list[ET.Element] = []
+        worldbody = ET.Element("worldbody")
+        ref_objects = [object_instance for object_instance in self.objects if isinstance(object_instance, RefObject)]
+        num_instances: dict[str, int] = {}
+        for instance in self.working_stations + ref_objects:
+            path = os.path.abspath(instance.fileRef)
+            if path not in sections:
+                sections[path] = xml_parse_cache.get_sections(path)
+            bodies, body_sections = xml_parse_cache.create_instance(path, instance.position,
+                                                                    num_instances.get(path, 0))
+            num_instances[path] = num_instances.get(path, 0) + 1
+            worldbody.extend(bodies)
+            instance_sections.extend(body_sections)
+        mp_xml_str = "".join(f'\n\t{ET.tostring(section, encoding="unicode")}'
+                             for file_sections in sections.values() for section in file_sections)
+        mp_xml_str += "".join(f'\n\t{ET.tostring(section, encoding="unicode")}' for section in instance_sections)
+        if len(worldbody) > 0:
+            mp_xml_str += f'\n\t{ET.tostring(worldbody, encoding="unicode")}'
+        mp_xml_str += self.create_primitive_objects_xml_str()
+        return mp_xml_str
+
+    def create_primitive_objects_xml_str(self) -> str:
+        """
+        Creates a single worldbody containing one body per cube and ball object.
+        The size of a box geom is half its width, length and height, the size of a sphere geom its radius.
+        :return: MJCF of the worldbody, empty if the environment has no cube or ball objects.
+        """
+        bodies = []
         for object_instance in self.objects:
-            if isinstance(object_instance, RefObject):
-                dirname, basename = os.path.split(object_instance.fileRef)
-                tmp = tempfile.NamedTemporaryFile(delete=False, prefix=basename, dir=dirname)
-                et = ET.parse(object_instance.fileRef)
-                body = et.find("worldbody").find("body")
-                body.attrib["pos"] = (f'{object_instance.position[0]} {object_instance.position[1]} '
-                                      f'{object_instance.position[2]}')
-                et.write(tmp.name)
-                mp_xml_str += f'\n\t<include file="{tmp.name}"/>'
             if isinstance(object_instance, CubeObject):
-                root = ET.Element("worldbody")
-                body = ET.SubElement(root, "body")
-                geom = ET.SubElement(body, "geom")
-                geom.attrib["type"] = "box"
-                geom.attrib["pos"] = (f'{object_instance.position[0]} {object_instance.position[1]} '
-                                      f'{object_instance.position[2]}')
-                geom.attrib["size"] = (f'{object_instance.width / 2} {object_instance.length / 2} '
-                                       f'{object_instance.height / 2}')
-                mp_xml_str += f'\n\t{ET.tostring(root)}'
-            if isinstance(object_instance, BallObject):
-                root = ET.Element("worldbody")
-                body = ET.SubElement(root, "body")
-                geom = ET.SubElement(body, "geom")
-                geom.attrib["type"] = "sphere"
-                geom.attrib["pos"] = (f'{object_instance.position[0]} {object_instance.position[1]} '
-                                      f'{object_instance.position[2]}')
-                geom.attrib["size"] = f'{object_instance.radius}'
-                mp_xml_str += f'\n\t{ET.tostring(root)}'
-        return mp_xml_str
+                geom_type = "box"
+                size = f'{object_instance.width / 2} {object_instance.length / 2} {object_instance.height / 2}'
+            elif isinstance(object_instance, BallObject):
+                geom_type = "sphere"
+                size = f'{object_instance.radius}'
+            else:
+                continue
+            x, y, z = object_instance.position
+            rgba = " ".join(str(value) for value in object_instance.color)
+            bodies.append(f'<body><geom type="{geom_type}" pos="{x} {y} {z}" size="{size}" '
+                          f'friction="{object_instance.friction}" rgba="{rgba}" /></body>')
+        if len(bodies) == 0:
+            return ""
+        return f'\n\t<worldbody>{"".join(bodies)}</worldbody>'
 
-    def to_config(self):
+    def copy(self) -> "Environment":
+        """
+        Creates a copy of the environment which shares no mutable state with it, e.g. to build it on another thread
+        while the environment is edited. The mover presets and referenced files are shared.
+        """
+        environment = copy.copy(self)
+        environment.init_tiles()
+        environment.tiles = self.tiles
+        environment.movers = self.movers.copy()
+        environment.working_stations = [copy.copy(working_station) for working_station in self.working_stations]
+        environment.objects = [copy.copy(object_instance) for object_instance in self.objects]
+        return environment
+
+    def content_hash(self) -> str:
+        """
+        Creates a hash of everything the simulation model of the environment depends on: the physical parameters,
+        tiles, movers with their presets, working stations and objects. The names of the environment and its entities,
+        the tile storage and the colors of working stations and referenced objects, which are only shown in the
+        configurator, are ignored. Referenced XML files are represented by their path, modification time and size.
+        :return: Hexadecimal sha256 digest, equal for environments which create the same simulation model.
+        """
+        content = hashlib.sha256()
+        parameters = [(f.name, getattr(self, f.name)) for f in fields(self)
+                      if f.name not in ["name", "tile_data", "movers", "working_stations", "objects", "tile_storage"]]
+        content.update(repr(parameters).encode("utf-8"))
+        tiles = np.ascontiguousarray(self.tiles, dtype=np.uint8)
+        content.update(repr(tiles.shape).encode("utf-8"))
+        content.update(tiles.tobytes())
+        for name in MoverTable.COLUMNS:
+            if name != "preset_id":
+                content.update(self.movers.column(name).tobytes())
+        content.update(np.ascontiguousarray(self.movers.get_preset_values()).tobytes())
+        for entity in self.working_stations + self.objects:
+            if isinstance(entity, WorkingStation | RefObject):
+                entity_content = (entity.position, entity.fileRef, get_file_key(entity.fileRef))
+            else:
+                entity_content = [(f.name, getattr(entity, f.name)) for f in fields(entity) if f.name != "name"]
+            content.update(repr((type(entity).__name__, entity_content)).encode("utf-8"))
+        return content.hexdigest()
+
+    def to_config(self, tiles_encoding="plain"):
+        """
+        Creates the config of the environment.
+        :param tiles_encoding: Encoding of the tiles string, see TILES_ENCODINGS. Only encodings other than "plain"
+        are stored in the config as tiles_encoding.
+        """
         config = {}
         config['width'] = self.num_width
         config['length'] = self.num_length
-        config['tiles'] = "".join(str(x) for x in self.tiles.reshape(self.num_width * self.num_length))
+        config['tiles'] = encode_tiles(self.tiles, tiles_encoding)
+        if tiles_encoding != "plain":
+            config['tiles_encoding'] = tiles_encoding
         config['tile_width'] = self.tile_width / 2
         config['tile_length'] = self.tile_length / 2
         config['tile_height'] = self.tile_height / 2
@@ -213,10 +411,7 @@ class Environment:
         config['min_friction'] = self.min_friction
         config['max_friction'] = self.max_friction
         config['num_movers'] = len(self.movers)
-        mover_config = {}
-        for idx, mover in enumerate(self.movers):
-            mover_config[idx] = mover.to_config(self.tile_width, self.tile_length)
-        config['movers'] = mover_config
+        config['movers'] = self.movers.to_config(self.tile_width, self.tile_length)
         config['num_objects'] = len(self.objects)
         objects_config = {}
         for idx, obj in enumerate(self.objects):
@@ -230,7 +425,14 @@ class Environment:
         return config
 
     @staticmethod
-    def from_config(name, config):
+    def from_config(name, config, tile_storage="int", tile_data: TileStorage | None = None):
+        """
+        Creates an environment from a config, see to_config.
+        :param name: Name of the environment.
+        :param config: Environment config.
+        :param tile_storage: How the tiles are stored, see create_tile_storage.
+        :param tile_data: Storage of the tiles which is used instead of the tiles of the config.
+        """
         environment = Environment(name=name, num_width=config["width"], num_length=config["length"],
                                   tile_width=config["tile_width"] * 2, tile_length=config["tile_length"] * 2,
                                   tile_height=config["tile_height"] * 2, tile_mass=config["tile_mass"],
@@ -240,9 +442,12 @@ class Environment:
                                   min_friction=config["min_friction"], max_friction=config["max_friction"],
                                   num_circles=config["num_circles"], offset=config["offset"],
                                   offset_wall=config["offset_wall"], j_max=config["j_max"],
-                                  learn_jerk=config["learn_jerk"])
-        environment.tiles = np.array([int(x) for x in config["tiles"]]).reshape((environment.num_width,
-                                                                                 environment.num_length))
+                                  learn_jerk=config["learn_jerk"], tile_storage=tile_storage)
+        if tile_data is not None:
+            environment.tile_data = tile_data
+        else:
+            environment.tiles = decode_tiles(config["tiles"], environment.num_width, environment.num_length,
+                                             config.get("tiles_encoding", "plain"))
         for x in range(config["num_movers"]):
             mover_config = config["movers"][x]
             environment.movers.append(Mover.from_config(mover_config, environment.tile_width, environment.tile_length))
@@ -258,3 +463,15 @@ class Environment:
             if object_config["type"] == "sphere":
                 environment.objects.append(BallObject.from_config(str(x), object_config))
         return environment
+
+
+def get_file_key(path: str) -> tuple[str, int, int] | None:
+    """
+    Returns the absolute path, modification time and size of a file, None if the file does not exist.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path, stat.st_mtime_ns, stat.st_size
@@ -1,25 +1,78 @@
-import random
-import string
-from dataclasses import dataclass
-
 from planar_robotics_configurator.model.environment.collision_shape import CollisionShape, BoxCollisionShape, \
     CircleCollisionShape
 from planar_robotics_configurator.model.environment.mover_preset import MoverPreset
 
 
-@dataclass(frozen=False)
 class Mover:
     """
     Represents a planar robot.
+    A mover which is added to the movers of an environment is a view of a row of the MoverTable, thus all values are
+    read from and written to the columns of the table. A mover which is not added stores its values itself.
+    Movers are compared by identity, every mover of a table represents its own row also if the values are equal.
     :param preset: Preset of the planar robot which provides size and mass of the robot.
     :param x: x Position of the planar robot in the tiles coordinate system.
     :param y: y Position of the planar robot in the tiles coordinate system.
     :param collision_shape: Collision shape of the planar robot.
     """
-    preset: MoverPreset
-    x: int
-    y: int
-    collision_shape: CollisionShape | None
+    ATTRIBUTES = ["preset", "x", "y", "collision_shape"]
+
+    def __init__(self, preset: MoverPreset, x: int, y: int, collision_shape: CollisionShape | None):
+        self.table = None
+        self.row = -1
+        self.values = {"preset": preset, "x": x, "y": y, "collision_shape": collision_shape}
+
+    def __repr__(self):
+        return (f"Mover(preset={self.preset!r}, x={self.x!r}, y={self.y!r}, "
+                f"collision_shape={self.collision_shape!r})")
+
+    def get(self, name):
+        """
+        Returns the value of an attribute, see ATTRIBUTES.
+        """
+        if self.table is None:
+            return self.values[name]
+        return self.table.get(self.row, name)
+
+    def set(self, name, value):
+        """
+        Sets the value of an attribute, see ATTRIBUTES.
+        """
+        if self.table is None:
+            self.values[name] = value
+        else:
+            self.table.set(self.row, name, value)
+
+    @property
+    def preset(self) -> MoverPreset:
+        return self.get("preset")
+
+    @preset.setter
+    def preset(self, preset: MoverPreset):
+        self.set("preset", preset)
+
+    @property
+    def x(self) -> int:
+        return self.get("x")
+
+    @x.setter
+    def x(self, x: int):
+        self.set("x", x)
+
+    @property
+    def y(self) -> int:
+        return self.get("y")
+
+    @y.setter
+    def y(self, y: int):
+        self.set("y", y)
+
+    @property
+    def collision_shape(self) -> CollisionShape | None:
+        return self.get("collision_shape")
+
+    @collision_shape.setter
+    def collision_shape(self, collision_shape: CollisionShape | None):
+        self.set("collision_shape", collision_shape)
 
     def to_config(self, tile_width, tile_length):
         config = {
@@ -40,14 +93,7 @@ class Mover:
         length = config["length"] * 2
         height = config["height"] * 2
         mass = config["mass"]
-        presets = list(filter(lambda p: p.width == width and p.length == length and p.height == height
-                                        and p.mass == mass, ConfiguratorModel().mover_presets))
-        if len(presets) == 0:
-            preset = MoverPreset(name=''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(10)),
-                                 width=width, length=length, height=height, mass=mass)
-            ConfiguratorModel().mover_presets.append(preset)
-        else:
-            preset = presets[0]
+        preset = ConfiguratorModel().get_or_create_mover_preset(width, length, height, mass)
         collision_shape_config = config["collision_shape"]
         collision_shape = None
         match collision_shape_config["shape"]:
@@ -57,7 +103,7 @@ class Mover:
                 collision_shape = CircleCollisionShape.from_config(collision_shape_config)
         return Mover(
             preset=preset,
-            x=round((config["x"] / tile_width) - 0.5, 0),
-            y=round((config["y"] / tile_length) - 0.5, 0),
+            x=int(round((config["x"] / tile_width) - 0.5, 0)),
+            y=int(round((config["y"] / tile_length) - 0.5, 0)),
             collision_shape=collision_shape
         )
@@ -0,0 +1,300 @@
+import numpy as np
+
+from planar_robotics_configurator.model.environment.collision_shape import CollisionShape, BoxCollisionShape, \
+    CircleCollisionShape
+from planar_robotics_configurator.model.environment.mover import Mover
+from planar_robotics_configurator.model.environment.mover_preset import MoverPreset
+
+# Collision shapes by their code in the shape column.
+COLLISION_SHAPES = [None, BoxCollisionShape, CircleCollisionShape]
+
+
+class MoverTable:
+    """
+    Stores the movers of an environment as columns of NumPy arrays (struct of arrays).
+    Behaves like a list of movers: every row has one cached Mover view, which is returned on every access.
+    The views of tables created from columns are only created when the movers are accessed.
+    Columns:
+        x, y: Position of the movers in the tiles coordinate system.
+        preset_id: Index of the preset of the movers in presets.
+        shape: Code of the collision shape of the movers, see COLLISION_SHAPES.
+        shape_width, shape_length: Size of box collision shapes.
+        shape_radius: Radius of circle collision shapes.
+    """
+    COLUMNS = {"x": np.int64, "y": np.int64, "preset_id": np.int32, "shape": np.int8, "shape_width": np.float64,
+               "shape_length": np.float64, "shape_radius": np.float64}
+
+    def __init__(self, movers=None, capacity: int = 16):
+        """
+        :param movers: Movers which are added to the table.
+        :param capacity: Initial number of rows of the columns.
+        """
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.presets: list[MoverPreset] = []
+        self.preset_ids: dict[int, int] = {}
+        self._views: list[Mover] = []
+        for mover in movers if movers is not None else []:
+            self.append(mover)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(list(self.views))
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def __contains__(self, mover):
+        return isinstance(mover, Mover) and mover.table is self
+
+    def __repr__(self):
+        return f"MoverTable({self.views!r})"
+
+    @property
+    def views(self) -> list[Mover]:
+        """
+        Mover view of every row, creates the views of rows without view.
+        """
+        for row in range(len(self._views), self.size):
+            mover = Mover(None, 0, 0, None)
+            mover.table, mover.row, mover.values = self, row, None
+            self._views.append(mover)
+        return self._views
+
+    @views.setter
+    def views(self, views: list[Mover]):
+        self._views = views
+
+    def column(self, name) -> np.ndarray:
+        """
+        Returns a writable view of the used rows of a column.
+        """
+        return self.columns[name][:self.size]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.column("x")
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.column("y")
+
+    def get_preset_id(self, preset: MoverPreset) -> int:
+        """
+        Returns the index of the preset in presets, adds the preset if it is not used yet.
+        """
+        preset_id = self.preset_ids.get(id(preset))
+        if preset_id is None:
+            preset_id = len(self.presets)
+            self.presets.append(preset)
+            self.preset_ids[id(preset)] = preset_id
+        return preset_id
+
+    def get_preset_values(self) -> np.ndarray:
+        """
+        Returns the [num_movers, 4] array of the width, length, height and mass of the presets of all movers.
+        """
+        values = np.array([[preset.width, preset.length, preset.height, preset.mass] for preset in self.presets],
+                          dtype=np.float64).reshape(-1, 4)
+        return values[self.column("preset_id")]
+
+    def get(self, row: int, name: str):
+        """
+        Returns the value of a mover attribute (see Mover.ATTRIBUTES) in the given row.
+        """
+        match name:
+            case "preset":
+                return self.presets[self.columns["preset_id"][row]]
+            case "x" | "y":
+                return int(self.columns[name][row])
+            case "collision_shape":
+                shape = COLLISION_SHAPES[self.columns["shape"][row]]
+                if shape is BoxCollisionShape:
+                    return BoxCollisionShape(width=float(self.columns["shape_width"][row]),
+                                             length=float(self.columns["shape_length"][row]))
+                if shape is CircleCollisionShape:
+                    return CircleCollisionShape(radius=float(self.columns["shape_radius"][row]))
+                return None
+        raise KeyError(name)
+
+    def set(self, row: int, name: str, value):
+        """
+        Sets the value of a mover attribute (see Mover.ATTRIBUTES) in the given row.
+        """
+        match name:
+            case "preset":
+                self.columns["preset_id"][row] = self.get_preset_id(value)
+            case "x" | "y":
+                self.columns[name][row] = value
+            case "collision_shape":
+                self.set_collision_shape(row, value)
+            case _:
+                raise KeyError(name)
+
+    def set_collision_shape(self, row: int, collision_shape: CollisionShape | None):
+        """
+        Stores the collision shape of the mover in the given row in the shape columns.
+        """
+        self.columns["shape"][row] = COLLISION_SHAPES.index(type(collision_shape) if collision_shape is not None
+                                                            else None)
+        self.columns["shape_width"][row] = getattr(collision_shape, "width", 0)
+        self.columns["shape_length"][row] = getattr(collision_shape, "length", 0)
+        self.columns["shape_radius"][row] = getattr(collision_shape, "radius", 0)
+
+    def append(self, mover: Mover):
+        """
+        Adds a mover to the table. Afterward, the mover is a view of its row.
+        """
+        if mover.table is not None:
+            raise ValueError("Mover is already part of a mover table")
+        views = self.views
+        if self.size == len(self.columns["x"]):
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate((column, np.zeros(max(len(column), 1), dtype=column.dtype)))
+        row = self.size
+        self.size += 1
+        for name in Mover.ATTRIBUTES:
+            self.set(row, name, mover.values[name])
+        mover.table, mover.row, mover.values = self, row, None
+        views.append(mover)
+
+    def detach(self, mover: Mover):
+        """
+        Copies the values of the row into the mover, thus it does not depend on the table anymore.
+        """
+        mover.values = {name: self.get(mover.row, name) for name in Mover.ATTRIBUTES}
+        mover.table, mover.row = None, -1
+
+    def remove(self, mover: Mover):
+        """
+        Removes a mover from the table. Raises ValueError if the mover is not part of the table.
+        """
+        if mover not in self:
+            raise ValueError("Mover is not part of the mover table")
+        mask = np.ones(self.size, dtype=bool)
+        mask[mover.row] = False
+        self.keep(mask)
+
+    def keep(self, mask: np.ndarray):
+        """
+        Keeps the movers selected by the mask and removes all others.
+        :param mask: [num_movers] array of bool, True for movers which are kept.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        views = []
+        for mover, keep in zip(self.views, mask.tolist()):
+            if keep:
+                views.append(mover)
+            else:
+                self.detach(mover)
+        for name, column in self.columns.items():
+            kept = column[:self.size][mask]
+            column[:len(kept)] = kept
+        for row, mover in enumerate(views):
+            mover.row = row
+        self.views = views
+        self.size = len(views)
+
+    def clear(self):
+        """
+        Removes all movers.
+        """
+        self.keep(np.zeros(self.size, dtype=bool))
+
+    @staticmethod
+    def from_columns(columns: dict[str, np.ndarray], presets: list[MoverPreset]) -> "MoverTable":
+        """
+        Creates a table from complete columns at once, without creating the movers one by one.
+        :param columns: Arrays of all columns (see COLUMNS) with one entry per mover, the arrays are copied.
+        :param presets: Presets indexed by the preset_id column.
+        """
+        table = MoverTable(capacity=0)
+        preset_ids = np.array([table.get_preset_id(preset) for preset in presets], dtype=np.int32)
+        table.size = len(columns["x"])
+        table.columns = {name: np.array(columns[name], dtype=dtype) for name, dtype in MoverTable.COLUMNS.items()}
+        if len(preset_ids) > 0:
+            # The same preset may be given multiple times.
+            table.columns["preset_id"] = preset_ids[table.columns["preset_id"]]
+        return table
+
+    def copy(self) -> "MoverTable":
+        """
+        Creates a copy of the table with copied columns and new views. The presets are shared.
+        """
+        return MoverTable.from_columns({name: self.column(name) for name in self.COLUMNS}, self.presets)
+
+    def to_config(self, tile_width, tile_length) -> dict:
+        """
+        Creates the configs of all movers by index, see Mover.to_config.
+        """
+        xs = ((self.x + 0.5) * tile_width).tolist()
+        ys = ((self.y + 0.5) * tile_length).tolist()
+        values = self.get_preset_values().tolist()
+        config = {}
+        for idx, (x, y, (width, length, height, mass)) in enumerate(zip(xs, ys, values)):
+            collision_shape = self.get(idx, "collision_shape")
+            config[idx] = {
+                "x": x,
+                "y": y,
+                "width": width / 2,
+                "length": length / 2,
+                "height": height / 2,
+                "mass": mass,
+                "collision_shape": collision_shape.to_config() if collision_shape is not None else None
+            }
+        return config
+
+
+class LazyMoverTable(MoverTable):
+    """
+    Reads the movers on first access of their values or presets, e.g. from a memory-mapped snapshot, and stores them
+    like a MoverTable afterward. Only the number of movers is known without reading them, see LazyTileStorage.
+    """
+
+    def __init__(self, load, size: int):
+        """
+        :param load: Function returning the MoverTable of the movers.
+        :param size: Number of movers.
+        """
+        self.load = load
+        super().__init__(capacity=0)
+        self.size = size
+
+    def read(self):
+        """
+        Reads the movers if they are not read yet.
+        """
+        if self.load is not None:
+            load, self.load = self.load, None
+            table = load()
+            assert len(table) == self.size
+            self._columns, self._presets, self._preset_ids = table.columns, table.presets, table.preset_ids
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        self.read()
+        return self._columns
+
+    @columns.setter
+    def columns(self, columns: dict[str, np.ndarray]):
+        self._columns = columns
+
+    @property
+    def presets(self) -> list[MoverPreset]:
+        self.read()
+        return self._presets
+
+    @presets.setter
+    def presets(self, presets: list[MoverPreset]):
+        self._presets = presets
+
+    @property
+    def preset_ids(self) -> dict[int, int]:
+        self.read()
+        return self._preset_ids
+
+    @preset_ids.setter
+    def preset_ids(self, preset_ids: dict[int, int]):
+        self._preset_ids = preset_ids
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from typing import Tuple
 
+# Sliding friction of primitive objects in configs without friction, the default of MuJoCo.
+DEFAULT_FRICTION = 1.0
+
 
 @dataclass(frozen=False)
 class Object:
@@ -53,11 +56,13 @@ class CubeObject(Object):
         config["width"] = self.width / 2
         config["length"] = self.length / 2
         config["height"] = self.height / 2
+        config["friction"] = self.friction
         return config
 
     @staticmethod
     def from_config(name, config):
-        return CubeObject(name=name, width=config["width"], length=config["length"], height=config["height"],
+        return CubeObject(name=name, width=config["width"] * 2, length=config["length"] * 2,
+                          height=config["height"] * 2, friction=config.get("friction", DEFAULT_FRICTION),
                           position=(config["x"], config["y"], config["z"]), color=(1, 1, 1, 1))
 
 
@@ -74,9 +79,10 @@ class BallObject(Object):
             "z": self.position[2]
         }
         config["radius"] = self.radius
+        config["friction"] = self.friction
         return config
 
     @staticmethod
     def from_config(name, config):
-        return BallObject(name=name, radius=config["radius"], position=(config["x"], config["y"], config["z"]),
-                          color=(1, 1, 1, 1))
+        return BallObject(name=name, radius=config["radius"], friction=config.get("friction", DEFAULT_FRICTION),
+                          position=(config["x"], config["y"], config["z"]), color=(1, 1, 1, 1))
@@ -0,0 +1,273 @@
+import io
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from planar_robotics_configurator.model.environment.environment import Environment
+from planar_robotics_configurator.model.environment.mover_table import MoverTable, LazyMoverTable
+from planar_robotics_configurator.model.environment.tile_storage import TileStorage, LazyTileStorage
+from planar_robotics_configurator.model.environment.tiles_codec import encode_tiles, decode_tiles
+
+# Version of the snapshot format, stored in the header.
+SNAPSHOT_VERSION = 1
+# Keys of the environment config which are stored as arrays instead of the JSON header.
+SNAPSHOT_ARRAY_KEYS = ["tiles", "tiles_encoding", "num_movers", "movers", "num_objects", "objects",
+                       "num_working_stations", "working_stations"]
+COLLISION_SHAPES = [None, "box", "circle"]
+OBJECT_TYPES = ["ref", "cube", "sphere"]
+MOVER_DTYPE = np.dtype([("x", np.float64), ("y", np.float64), ("width", np.float64), ("length", np.float64),
+                        ("height", np.float64), ("mass", np.float64), ("shape", np.int8), ("shape_width", np.float64),
+                        ("shape_length", np.float64), ("shape_radius", np.float64)])
+OBJECT_DTYPE = np.dtype([("type", np.int8), ("x", np.float64), ("y", np.float64), ("z", np.float64),
+                         ("ref", np.int32), ("width", np.float64), ("length", np.float64), ("height", np.float64),
+                         ("radius", np.float64), ("friction", np.float64)])
+WORKING_STATION_DTYPE = np.dtype([("x", np.float64), ("y", np.float64), ("z", np.float64)])
+
+
+def config_to_snapshot(config) -> dict[str, np.ndarray]:
+    """
+    Converts an environment config (see Environment.to_config) to the arrays of a snapshot.
+    The snapshot contains the tiles as array, one structured array each for movers, objects and working stations,
+    the file references of objects and working stations and a JSON header with all other values of the config.
+    Optional values of the config are stored as NaN.
+    """
+    header = {key: value for key, value in config.items() if key not in SNAPSHOT_ARRAY_KEYS}
+    header["snapshot_version"] = SNAPSHOT_VERSION
+    tiles = decode_tiles(config["tiles"], config["width"], config["length"], config.get("tiles_encoding", "plain"))
+
+    movers = []
+    for idx in range(config["num_movers"]):
+        mover = config["movers"][idx]
+        shape = mover["collision_shape"]
+        shape = shape if shape is not None else {"shape": None}
+        movers.append((mover["x"], mover["y"], mover["width"], mover["length"], mover["height"], mover["mass"],
+                       COLLISION_SHAPES.index(shape["shape"]), shape.get("width", np.nan),
+                       shape.get("length", np.nan), shape.get("radius", np.nan)))
+
+    objects = []
+    object_refs = []
+    for idx in range(config["num_objects"]):
+        obj = config["objects"][idx]
+        ref = -1
+        if "ref" in obj:
+            ref = len(object_refs)
+            object_refs.append(obj["ref"])
+        objects.append((OBJECT_TYPES.index(obj["type"]), obj["x"], obj["y"], obj["z"], ref,
+                        obj.get("width", np.nan), obj.get("length", np.nan), obj.get("height", np.nan),
+                        obj.get("radius", np.nan), obj.get("friction", np.nan)))
+
+    working_stations = []
+    working_station_refs = []
+    for idx in range(config["num_working_stations"]):
+        working_station = config["working_stations"][idx]
+        working_stations.append((working_station["x"], working_station["y"], working_station["z"]))
+        working_station_refs.append(working_station["ref"])
+
+    return {
+        "header": np.array(json.dumps(header)),
+        "tiles": tiles.astype(np.uint8),
+        "movers": np.array(movers, dtype=MOVER_DTYPE),
+        "objects": np.array(objects, dtype=OBJECT_DTYPE),
+        "object_refs": np.array(object_refs, dtype=str),
+        "working_stations": np.array(working_stations, dtype=WORKING_STATION_DTYPE),
+        "working_station_refs": np.array(working_station_refs, dtype=str)
+    }
+
+
+def snapshot_to_config(snapshot, include_tiles=True, include_movers=True) -> dict:
+    """
+    Converts the arrays of a snapshot (see config_to_snapshot) back to the environment config.
+    :param snapshot: Mapping of the snapshot arrays, e.g. the result of np.load.
+    :param include_tiles: If False, the tiles are not read and the config does not contain tiles.
+    :param include_movers: If False, the movers are not read and the config contains no movers.
+    """
+    config = read_snapshot_header(snapshot)
+    if include_tiles:
+        config["tiles"] = encode_tiles(snapshot["tiles"])
+
+    movers = snapshot["movers"] if include_movers else np.zeros(0, dtype=MOVER_DTYPE)
+    config["num_movers"] = len(movers)
+    config["movers"] = {}
+    for idx, (x, y, width, length, height, mass, shape, shape_width, shape_length, shape_radius) in enumerate(
+            movers.tolist()):
+        collision_shape = None
+        match COLLISION_SHAPES[shape]:
+            case "box":
+                collision_shape = {"shape": "box", "width": shape_width, "length": shape_length}
+            case "circle":
+                collision_shape = {"shape": "circle", "radius": shape_radius}
+        config["movers"][idx] = {"x": x, "y": y, "width": width, "length": length, "height": height, "mass": mass,
+                                 "collision_shape": collision_shape}
+
+    objects = snapshot["objects"]
+    object_refs = snapshot["object_refs"].tolist()
+    config["num_objects"] = len(objects)
+    config["objects"] = {}
+    for idx, row in enumerate(objects.tolist()):
+        obj = {"type": OBJECT_TYPES[row[0]], "x": row[1], "y": row[2], "z": row[3]}
+        if row[4] >= 0:
+            obj["ref"] = object_refs[row[4]]
+        for key, value in zip(OBJECT_DTYPE.names[5:], row[5:]):
+            if not np.isnan(value):
+                obj[key] = value
+        config["objects"][idx] = obj
+
+    working_stations = snapshot["working_stations"]
+    working_station_refs = snapshot["working_station_refs"].tolist()
+    config["num_working_stations"] = len(working_stations)
+    config["working_stations"] = {}
+    for idx, (x, y, z) in enumerate(working_stations.tolist()):
+        config["working_stations"][idx] = {"ref": working_station_refs[idx], "x": x, "y": y, "z": z}
+    return config
+
+
+def read_snapshot_header(snapshot) -> dict:
+    """
+    Returns the header values of the environment config stored in a snapshot.
+    """
+    header = json.loads(snapshot["header"].item())
+    version = header.pop("snapshot_version")
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {version} is not supported")
+    return header
+
+
+def save_snapshot(file, config) -> None:
+    """
+    Saves an environment config as uncompressed npz snapshot.
+    :param file: Path or file object, np.savez appends .npz to paths without this extension.
+    :param config: Environment config, see Environment.to_config.
+    """
+    np.savez(file, **config_to_snapshot(config))
+
+
+def load_snapshot(file) -> dict:
+    """
+    Loads the environment config from a npz snapshot created by save_snapshot.
+    :param file: Path or file object of the snapshot.
+    """
+    with np.load(file, allow_pickle=False) as snapshot:
+        return snapshot_to_config(snapshot)
+
+
+def read_npy_headers(file) -> dict[str, tuple[tuple, bool, np.dtype, int]]:
+    """
+    Reads the headers of all arrays in an uncompressed npz file without reading the array data.
+    :param file: Path of the npz file.
+    :return: (shape, fortran_order, dtype, offset of the data in the file) by array name.
+    """
+    headers = {}
+    with zipfile.ZipFile(file) as archive, open(file, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Array {info.filename} of {file} is compressed")
+            # The data of a member starts after its local file header with variable name and extra field.
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            headers[info.filename.removesuffix(".npy")] = (shape, fortran_order, dtype, f.tell())
+    return headers
+
+
+def map_snapshot(file) -> dict[str, np.ndarray]:
+    """
+    Memory-maps all arrays of a snapshot, thus the data is only read from the file when it is accessed.
+    :param file: Path of the snapshot.
+    """
+    arrays = {}
+    for key, (shape, fortran_order, dtype, offset) in read_npy_headers(file).items():
+        if int(np.prod(shape)) == 0:
+            arrays[key] = np.zeros(shape, dtype=dtype)
+            continue
+        arrays[key] = np.memmap(file, dtype=dtype, mode="r", offset=offset, shape=shape,
+                                order="F" if fortran_order else "C")
+    return arrays
+
+
+def read_snapshot_info(file) -> dict:
+    """
+    Reads the metadata of a snapshot without reading tiles, movers, objects and working stations.
+    :param file: Path of the snapshot.
+    :return: Header values of the environment config and the number of movers, objects and working stations.
+    """
+    headers = read_npy_headers(file)
+    with zipfile.ZipFile(file) as archive:
+        header = np.lib.format.read_array(io.BytesIO(archive.read("header.npy")), allow_pickle=False)
+    info = read_snapshot_header({"header": header})
+    info["num_movers"] = headers["movers"][0][0]
+    info["num_objects"] = headers["objects"][0][0]
+    info["num_working_stations"] = headers["working_stations"][0][0]
+    return info
+
+
+def list_snapshots(directory) -> list[tuple[str, dict]]:
+    """
+    Lists the metadata of all snapshots in a directory, see read_snapshot_info.
+    :param directory: Directory containing npz snapshots.
+    :return: (path, info) of all snapshots sorted by path.
+    """
+    snapshots = []
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(".npz"):
+            path = os.path.join(directory, file_name)
+            snapshots.append((path, read_snapshot_info(path)))
+    return snapshots
+
+
+def create_mover_table(movers: np.ndarray, tile_width, tile_length) -> MoverTable:
+    """
+    Creates the mover table from the mover array of a snapshot with whole-column operations.
+    Positions are converted to tiles like Mover.from_config and the preset is looked up once per distinct dimensions.
+    :param movers: Structured array of MOVER_DTYPE, e.g. memory-mapped.
+    :param tile_width: Width of the tiles of the environment.
+    :param tile_length: Length of the tiles of the environment.
+    """
+    from planar_robotics_configurator.model.configurator_model import ConfiguratorModel
+    values = np.stack((movers["width"] * 2, movers["length"] * 2, movers["height"] * 2, movers["mass"]), axis=1)
+    values = values.reshape(-1, 4)
+    # Combines the codes of the distinct values of every column to one code per distinct row, which is faster than
+    # np.unique along axis 0. The codes are compacted after every column, thus they stay below num_movers ** 2.
+    codes = np.zeros(len(values), dtype=np.int64)
+    for column in values.T:
+        column_values, column_codes = np.unique(column, return_inverse=True)
+        _, codes = np.unique(codes * len(column_values) + column_codes.reshape(-1), return_inverse=True)
+    _, first_rows, preset_ids = np.unique(codes.reshape(-1), return_index=True, return_inverse=True)
+    presets = [ConfiguratorModel().get_or_create_mover_preset(*preset_values)
+               for preset_values in values[first_rows].tolist()]
+    return MoverTable.from_columns({
+        "x": np.round(movers["x"] / tile_width - 0.5),
+        "y": np.round(movers["y"] / tile_length - 0.5),
+        "preset_id": preset_ids.reshape(-1),
+        "shape": movers["shape"],
+        "shape_width": np.nan_to_num(movers["shape_width"]),
+        "shape_length": np.nan_to_num(movers["shape_length"]),
+        "shape_radius": np.nan_to_num(movers["shape_radius"])
+    }, presets)
+
+
+def load_snapshot_environment(name, file, tile_storage="int") -> Environment:
+    """
+    Loads an environment from a snapshot with memory-mapped arrays.
+    The tiles and the movers are only read from the file when they are accessed the first time, the movers are then
+    converted to the mover table column-wise, see LazyMoverTable and create_mover_table.
+    :param name: Name of the environment.
+    :param file: Path of the snapshot.
+    :param tile_storage: Storage of the tiles after reading them, see create_tile_storage.
+    """
+    snapshot = map_snapshot(file)
+    config = snapshot_to_config(snapshot, include_tiles=False, include_movers=False)
+    tile_data: TileStorage = LazyTileStorage(lambda: snapshot["tiles"], snapshot["tiles"].shape, tile_storage)
+    environment = Environment.from_config(name, config, tile_storage=tile_storage, tile_data=tile_data)
+    # The tile size of the snapshot, the environment may be rotated before the movers are read.
+    tile_width, tile_length = environment.tile_width, environment.tile_length
+    environment.movers = LazyMoverTable(lambda: create_mover_table(snapshot["movers"], tile_width, tile_length),
+                                        len(snapshot["movers"]))
+    return environment
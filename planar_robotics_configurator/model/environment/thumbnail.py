@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+
+import mujoco
+import numpy as np
+from gymnasium_planar_robotics.envs.basic_envs import BasicPlanarRoboticsEnv
+
+from planar_robotics_configurator.model.environment.environment import Environment
+
+# Directory of the thumbnails cached on disk by default.
+THUMBNAIL_DIRECTORY = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                                   "planar_robotics_configurator", "thumbnails")
+
+
+def create_thumbnail_camera(environment: Environment) -> mujoco.MjvCamera:
+    """
+    Creates a free camera looking diagonally from above at the center of the tiles, far enough to see all tiles.
+    """
+    size_x = environment.num_width * environment.tile_width
+    size_y = environment.num_length * environment.tile_length
+    camera = mujoco.MjvCamera()
+    camera.type = mujoco.mjtCamera.mjCAMERA_FREE
+    camera.lookat[:] = [size_x / 2, size_y / 2, environment.table_height]
+    camera.distance = 1.5 * max(size_x, size_y, environment.tile_width, environment.tile_length)
+    camera.azimuth = 135
+    camera.elevation = -45
+    return camera
+
+
+def render_env(env: BasicPlanarRoboticsEnv, camera: mujoco.MjvCamera, width: int, height: int) -> np.ndarray:
+    """
+    Renders the current state of a built environment offscreen. The derived quantities, e.g. the positions of the
+    geoms, are computed by mujoco.mj_forward first, thus a freshly built environment is rendered correctly.
+    The size must not exceed the offscreen buffer of the model, 640x480 by default.
+    :return: [height, width, 3] array of uint8 RGB values.
+    """
+    renderer = mujoco.Renderer(env.model, height=height, width=width)
+    try:
+        mujoco.mj_forward(env.model, env.data)
+        renderer.update_scene(env.data, camera=camera)
+        return renderer.render().copy()
+    finally:
+        renderer.close()
+
+
+def render_thumbnail(environment: Environment, width: int = 320, height: int = 240) -> np.ndarray:
+    """
+    Builds the environment without a viewer and renders it offscreen with the camera of create_thumbnail_camera.
+    No window is opened. On machines without display MuJoCo needs an offscreen OpenGL backend, which is selected by
+    setting the environment variable MUJOCO_GL to "egl" or "osmesa" (software rendering) before MuJoCo is imported.
+    :return: [height, width, 3] array of uint8 RGB values.
+    """
+    env = environment.create_basic_planar_robotics_env(passive_viewer=False)
+    try:
+        return render_env(env, create_thumbnail_camera(environment), width, height)
+    finally:
+        env.close()
+
+
+class ThumbnailCache:
+    """
+    Caches rendered thumbnails on disk as NumPy files named by the content hash of the environment and the size.
+    Thus, a thumbnail is rendered once per environment content, also across runs of the configurator.
+    """
+
+    def __init__(self, directory: str = THUMBNAIL_DIRECTORY, width: int = 320, height: int = 240):
+        """
+        :param directory: Directory of the cached thumbnails, created if it does not exist.
+        :param width: Width of the thumbnails in pixels.
+        :param height: Height of the thumbnails in pixels.
+        """
+        self.directory = directory
+        self.width = width
+        self.height = height
+
+    def get_path(self, content_hash: str) -> str:
+        """
+        Returns the path of the thumbnail of the environment with the given content hash.
+        """
+        return os.path.join(self.directory, f"{content_hash}_{self.width}x{self.height}.npy")
+
+    def get(self, environment: Environment) -> np.ndarray:
+        """
+        Returns the thumbnail of the environment, renders and stores it if it is not cached.
+        :return: [height, width, 3] array of uint8 RGB values.
+        """
+        path = self.get_path(environment.content_hash())
+        if os.path.exists(path):
+            try:
+                return np.load(path)
+            except (OSError, ValueError):
+                # Damaged file, rendered and stored again.
+                pass
+        image = render_thumbnail(environment, self.width, self.height)
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a unique file first, thus concurrent readers never load a partially written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, image)
+        os.replace(tmp_path, path)
+        return image
+
+    def clear(self) -> None:
+        """
+        Removes all cached thumbnails.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
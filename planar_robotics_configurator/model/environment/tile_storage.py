@@ -0,0 +1,265 @@
+import numpy as np
+
+
+class TileStorage:
+    """
+    Stores the tiles of an environment. A tile is 1 if it exists and 0 else.
+    The tiles are accessed in the tile coordinate-system, the array has the shape [num_width, num_length].
+    """
+
+    @property
+    def shape(self) -> (int, int):
+        raise NotImplementedError()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes used to store the tiles.
+        """
+        raise NotImplementedError()
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns the tiles as [num_width, num_length] array.
+        """
+        raise NotImplementedError()
+
+    def set_array(self, tiles: np.ndarray):
+        """
+        Replaces all tiles by the given [num_width, num_length] array, the shape may differ from the current shape.
+        """
+        raise NotImplementedError()
+
+    def get(self, x, y) -> int:
+        """
+        Returns the tile at position x, y.
+        """
+        raise NotImplementedError()
+
+    def get_area(self, x_start, y_start, x_end, y_end) -> np.ndarray:
+        """
+        Returns the tiles in the area [x_start, x_end) x [y_start, y_end) without reading the other tiles.
+        The returned array must not be changed.
+        """
+        raise NotImplementedError()
+
+    def set(self, index, value):
+        """
+        Sets the tiles selected by a NumPy index of the [num_width, num_length] array.
+        :param index: Index of the tiles, e.g. (x, y), slices, coordinate arrays or a boolean mask.
+        :param value: value or array of values of the tiles.
+        """
+        raise NotImplementedError()
+
+    def resize(self, num_width: int, num_length: int):
+        """
+        Resizes the tiles. Keeps the overlapping tiles and adds not existing tiles.
+        """
+        raise NotImplementedError()
+
+
+class DenseTileStorage(TileStorage):
+    """
+    Stores the tiles as [num_width, num_length] array of the given dtype.
+    The array returned by to_array is the stored array, thus changes to it are stored.
+    """
+
+    def __init__(self, num_width: int, num_length: int, dtype=int):
+        self.dtype = dtype
+        self.array = np.zeros((num_width, num_length), dtype=dtype)
+
+    @property
+    def shape(self) -> (int, int):
+        return self.array.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    def to_array(self) -> np.ndarray:
+        return self.array
+
+    def set_array(self, tiles: np.ndarray):
+        self.array = np.asarray(tiles).astype(self.dtype)
+
+    def get(self, x, y) -> int:
+        return self.array[x, y]
+
+    def get_area(self, x_start, y_start, x_end, y_end) -> np.ndarray:
+        return self.array[x_start:x_end, y_start:y_end]
+
+    def set(self, index, value):
+        self.array[index] = value
+
+    def resize(self, num_width: int, num_length: int):
+        if (num_width, num_length) == self.array.shape:
+            return
+        array = np.zeros((num_width, num_length), dtype=self.dtype)
+        width, length = min(num_width, self.array.shape[0]), min(num_length, self.array.shape[1])
+        array[:width, :length] = self.array[:width, :length]
+        self.array = array
+
+
+class PackedTileStorage(TileStorage):
+    """
+    Stores the tiles bit-packed along the y-axis (see np.packbits), which uses one bit per tile.
+    The bits after num_length in the last byte of a row are always zero.
+    The array returned by to_array is an unpacked read-only copy, changes have to be made by set.
+    Areas and indices selecting rows by slices or coordinates only unpack and repack the selected rows.
+    """
+
+    def __init__(self, num_width: int, num_length: int):
+        self.num_length = num_length
+        self.bits = np.zeros((num_width, (num_length + 7) // 8), dtype=np.uint8)
+
+    @property
+    def shape(self) -> (int, int):
+        return self.bits.shape[0], self.num_length
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def to_array(self) -> np.ndarray:
+        array = np.unpackbits(self.bits, axis=1, count=self.num_length)
+        array.flags.writeable = False
+        return array
+
+    def set_array(self, tiles: np.ndarray):
+        tiles = np.asarray(tiles)
+        self.num_length = tiles.shape[1]
+        self.bits = np.packbits(tiles.astype(bool), axis=1)
+
+    def get(self, x, y) -> int:
+        return int(self.bits[x, y >> 3] >> (7 - (y & 7))) & 1
+
+    def get_area(self, x_start, y_start, x_end, y_end) -> np.ndarray:
+        x_start, x_end, _ = slice(x_start, x_end).indices(self.bits.shape[0])
+        y_start, y_end, _ = slice(y_start, y_end).indices(self.num_length)
+        y_end = max(y_start, y_end)
+        # Unpack only the bytes containing the area.
+        bits = self.bits[x_start:x_end, y_start >> 3:(y_end + 7) >> 3]
+        offset = y_start & 7
+        return np.unpackbits(bits, axis=1, count=offset + y_end - y_start)[:, offset:]
+
+    def get_rows(self, index) -> tuple[slice | np.ndarray, slice | np.ndarray] | None:
+        """
+        Returns the rows selected by the x part of an index and the index of the x part into these rows.
+        :return: (rows, row index) or None if the index does not select rows by a slice or coordinates.
+        """
+        if isinstance(index, slice):
+            return slice(*index.indices(self.bits.shape[0])), slice(None)
+        xs = np.asarray(index)
+        if xs.dtype.kind not in "iu":
+            return None
+        xs = np.where(xs < 0, xs + self.bits.shape[0], xs)
+        rows, row_index = np.unique(xs, return_inverse=True)
+        return rows, row_index.reshape(xs.shape)
+
+    def set(self, index, value):
+        if (isinstance(index, tuple) and len(index) == 2 and isinstance(index[0], (int, np.integer))
+                and isinstance(index[1], (int, np.integer))):
+            x, y = index
+            if value:
+                self.bits[x, y >> 3] |= 1 << (7 - (y & 7))
+            else:
+                self.bits[x, y >> 3] &= ~np.uint8(1 << (7 - (y & 7)))
+            return
+        rows = self.get_rows(index[0]) if isinstance(index, tuple) and len(index) == 2 else None
+        if rows is not None:
+            rows, row_index = rows
+            array = np.unpackbits(self.bits[rows], axis=1, count=self.num_length)
+            array[row_index, index[1]] = value
+            self.bits[rows] = np.packbits(array, axis=1)
+            return
+        array = np.unpackbits(self.bits, axis=1, count=self.num_length)
+        array[index] = value
+        self.bits = np.packbits(array, axis=1)
+
+    def resize(self, num_width: int, num_length: int):
+        if (num_width, num_length) == self.shape:
+            return
+        bits = np.zeros((num_width, (num_length + 7) // 8), dtype=np.uint8)
+        width = min(num_width, self.bits.shape[0])
+        length = min(num_length, self.num_length)
+        num_bytes = (length + 7) // 8
+        bits[:width, :num_bytes] = self.bits[:width, :num_bytes]
+        if length % 8 != 0:
+            # Clear the bits of removed tiles in the last byte.
+            bits[:width, num_bytes - 1] &= np.uint8((0xFF << (8 - length % 8)) & 0xFF)
+        self.bits = bits
+        self.num_length = num_length
+
+
+class LazyTileStorage(TileStorage):
+    """
+    Reads the tiles on first access, e.g. from a memory-mapped snapshot, and stores them in a storage created by
+    create_tile_storage afterward. Only the shape is known without reading the tiles.
+    """
+
+    def __init__(self, load, shape: (int, int), tile_storage: str = "int"):
+        """
+        :param load: Function returning the [num_width, num_length] array of the tiles.
+        :param shape: Shape of the tiles.
+        :param tile_storage: Storage of the tiles after reading them.
+        """
+        self.load = load
+        self.tile_storage = tile_storage
+        self.tiles_shape = tuple(shape)
+        self.storage: TileStorage | None = None
+
+    def get_storage(self) -> TileStorage:
+        """
+        Returns the storage of the tiles, reads the tiles if they are not read yet.
+        """
+        if self.storage is None:
+            self.storage = create_tile_storage(self.tile_storage, *self.tiles_shape)
+            self.storage.set_array(np.asarray(self.load()))
+            self.load = None
+        return self.storage
+
+    @property
+    def shape(self) -> (int, int):
+        return self.tiles_shape if self.storage is None else self.storage.shape
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.storage is None else self.storage.nbytes
+
+    def to_array(self) -> np.ndarray:
+        return self.get_storage().to_array()
+
+    def set_array(self, tiles: np.ndarray):
+        self.get_storage().set_array(tiles)
+
+    def get(self, x, y) -> int:
+        return self.get_storage().get(x, y)
+
+    def get_area(self, x_start, y_start, x_end, y_end) -> np.ndarray:
+        return self.get_storage().get_area(x_start, y_start, x_end, y_end)
+
+    def set(self, index, value):
+        self.get_storage().set(index, value)
+
+    def resize(self, num_width: int, num_length: int):
+        self.get_storage().resize(num_width, num_length)
+
+
+def create_tile_storage(tile_storage: str, num_width: int, num_length: int) -> TileStorage:
+    """
+    Creates an empty tile storage.
+    :param tile_storage: Kind of the storage, "int", "uint8" or "bool" for an array of this dtype and "packed" for
+    bit-packed tiles.
+    :param num_width: Width number of tiles in x direction.
+    :param num_length: Length number of tiles in y direction.
+    """
+    match tile_storage:
+        case "int":
+            return DenseTileStorage(num_width, num_length, dtype=int)
+        case "uint8":
+            return DenseTileStorage(num_width, num_length, dtype=np.uint8)
+        case "bool":
+            return DenseTileStorage(num_width, num_length, dtype=bool)
+        case "packed":
+            return PackedTileStorage(num_width, num_length)
+    raise ValueError(f"Unknown tile storage {tile_storage}")
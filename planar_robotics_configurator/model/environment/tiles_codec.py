@@ -0,0 +1,59 @@
+import base64
+
+import numpy as np
+
+# Encodings of the tiles string in the environment config.
+# "plain": one character "0" or "1" per tile.
+# "rle": value of the first tile followed by the lengths of the runs of equal tiles, e.g. "0:3,2,1" for "000110".
+# "packed": base64 of the bit-packed tiles (see np.packbits).
+TILES_ENCODINGS = ["plain", "rle", "packed"]
+
+
+def encode_tiles(tiles: np.ndarray, encoding: str = "plain") -> str:
+    """
+    Encodes the tiles row by row (x then y) into a string.
+    :param tiles: [num_width, num_length] array of the tiles, 1 for existing tiles and 0 else.
+    :param encoding: Encoding of the string, see TILES_ENCODINGS.
+    """
+    flat = np.ascontiguousarray(tiles, dtype=np.uint8).reshape(-1)
+    match encoding:
+        case "plain":
+            return (flat + ord("0")).tobytes().decode("ascii")
+        case "rle":
+            if flat.size == 0:
+                return ""
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(flat)) + 1, [flat.size]))
+            return f"{flat[0]}:" + ",".join(map(str, np.diff(starts).tolist()))
+        case "packed":
+            return base64.b64encode(np.packbits(flat).tobytes()).decode("ascii")
+    raise ValueError(f"Unknown tiles encoding {encoding}")
+
+
+def decode_tiles(data: str, num_width: int, num_length: int, encoding: str = "plain") -> np.ndarray:
+    """
+    Decodes a tiles string created by encode_tiles.
+    :param data: Encoded tiles.
+    :param num_width: Width number of tiles in x direction.
+    :param num_length: Length number of tiles in y direction.
+    :param encoding: Encoding of the string, see TILES_ENCODINGS.
+    :return: [num_width, num_length] array of int.
+    """
+    size = num_width * num_length
+    match encoding:
+        case "plain":
+            flat = np.frombuffer(data.encode("ascii"), dtype=np.uint8) - ord("0")
+        case "rle":
+            if data == "":
+                flat = np.zeros(0, dtype=np.uint8)
+            else:
+                first, runs = data.split(":")
+                runs = np.array(runs.split(","), dtype=np.int64)
+                values = (np.arange(len(runs)) + int(first)) % 2
+                flat = np.repeat(values.astype(np.uint8), runs)
+        case "packed":
+            flat = np.unpackbits(np.frombuffer(base64.b64decode(data), dtype=np.uint8), count=size)
+        case _:
+            raise ValueError(f"Unknown tiles encoding {encoding}")
+    if flat.size != size or np.any(flat > 1):
+        raise ValueError(f"Invalid tiles for an environment of {num_width} x {num_length} tiles")
+    return flat.astype(int).reshape((num_width, num_length))
@@ -0,0 +1,140 @@
+import copy
+import os
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+# Compiler attributes of the directories in which the files of asset elements are searched, see MuJoCo compiler.
+FILE_DIRECTORIES = {"mesh": "meshdir", "skin": "meshdir", "hfield": "meshdir", "texture": "texturedir"}
+# Top-level elements which reference elements of the worldbody by name, thus they are copied for every instance.
+INSTANCE_SECTIONS = ["actuator", "sensor", "contact", "equality", "tendon"]
+# Attributes which define or reference names of elements of the worldbody and of the INSTANCE_SECTIONS.
+NAME_ATTRIBUTES = ["name", "body", "body1", "body2", "geom", "geom1", "geom2", "site", "site1", "site2", "joint",
+                   "joint1", "joint2", "jointinparent", "tendon", "tendon1", "tendon2", "actuator", "refsite",
+                   "cranksite", "slidersite", "sidesite", "objname", "refname", "target"]
+
+
+class XmlParseCache:
+    """
+    Least recently used cache of parsed MuJoCo XML files.
+    A file is parsed again if its modification time or size changed since it was parsed.
+    The cached trees must not be changed, instances are created by create_instance.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        :param max_entries: Maximal number of cached files.
+        """
+        self.max_entries = max_entries
+        self.trees: OrderedDict[str, tuple[tuple[int, int], ET.ElementTree, list[ET.Element], set[str]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.trees)
+
+    def get_entry(self, path: str) -> tuple[tuple[int, int], ET.ElementTree, list[ET.Element], set[str]]:
+        """
+        Returns the cache entry (key, tree, sections, names) of the file, parses the file if it is not cached or
+        changed. The names are the names of the elements which are copied for every instance, see create_instance.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self.trees.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            self.trees.move_to_end(path)
+            return entry
+        self.misses += 1
+        tree = ET.parse(path)
+        sections = create_sections(tree, os.path.dirname(path))
+        instance_elements = [tree.getroot().find("worldbody")] + [section for section in sections
+                                                                  if section.tag in INSTANCE_SECTIONS]
+        names = {element.attrib["name"] for instance_element in instance_elements if instance_element is not None
+                 for element in instance_element.iter() if "name" in element.attrib}
+        entry = (key, tree, sections, names)
+        self.trees[path] = entry
+        self.trees.move_to_end(path)
+        while len(self.trees) > self.max_entries:
+            self.trees.popitem(last=False)
+        return entry
+
+    def get(self, path: str) -> ET.ElementTree:
+        """
+        Returns the parsed tree of the file, parses the file if it is not cached or changed.
+        """
+        return self.get_entry(path)[1]
+
+    def get_sections(self, path: str) -> list[ET.Element]:
+        """
+        Returns the top-level elements of the file which are shared by all instances, i.e. all except worldbody,
+        compiler and the INSTANCE_SECTIONS, with absolute file paths.
+        Thus, the elements can be inserted once into a model in another directory, see create_sections.
+        """
+        return [section for section in self.get_entry(path)[2] if section.tag not in INSTANCE_SECTIONS]
+
+    def create_instance(self, path: str, position, index: int = 0) -> tuple[list[ET.Element], list[ET.Element]]:
+        """
+        Returns copies of all children of the worldbody and of the INSTANCE_SECTIONS of the file, in which the first
+        body is placed at the given position. The names of the copied elements and the references to them get the
+        suffix _{index}, thus several instances of a file can be added to a model. The first instance keeps the names.
+        :param path: Path of the MuJoCo XML file.
+        :param position: (x, y, z) position of the first body.
+        :param index: Number of instances of the file created before for the same model.
+        :return: Children of the worldbody and INSTANCE_SECTIONS.
+        """
+        _, tree, sections, names = self.get_entry(path)
+        worldbody = tree.getroot().find("worldbody")
+        bodies = [copy.deepcopy(child) for child in (worldbody if worldbody is not None else [])]
+        instance_sections = [copy.deepcopy(section) for section in sections if section.tag in INSTANCE_SECTIONS]
+        body = next((child for child in bodies if child.tag == "body"), None)
+        if body is not None:
+            body.attrib["pos"] = f'{position[0]} {position[1]} {position[2]}'
+        if index > 0:
+            for instance_element in bodies + instance_sections:
+                for element in instance_element.iter():
+                    for name in NAME_ATTRIBUTES:
+                        if element.attrib.get(name) in names:
+                            element.attrib[name] = f"{element.attrib[name]}_{index}"
+        return bodies, instance_sections
+
+    def clear(self) -> None:
+        """
+        Removes all cached trees and resets the hit and miss counts.
+        """
+        self.trees.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def create_sections(tree: ET.ElementTree, directory: str) -> list[ET.Element]:
+    """
+    Copies the top-level elements of a MuJoCo XML file except worldbody and compiler.
+    Relative file paths are resolved against the directory of the file and the asset directories of its compiler.
+    :param tree: Parsed MuJoCo XML file.
+    :param directory: Directory of the file.
+    """
+    root = tree.getroot()
+    compiler = root.find("compiler")
+    compiler_attrib = compiler.attrib if compiler is not None else {}
+    sections = []
+    for section in root:
+        if section.tag in ["worldbody", "compiler"]:
+            continue
+        section = copy.deepcopy(section)
+        for element in section.iter():
+            file_directory = directory
+            if element.tag in FILE_DIRECTORIES:
+                asset_directory = compiler_attrib.get(FILE_DIRECTORIES[element.tag], compiler_attrib.get("assetdir"))
+                if asset_directory is not None:
+                    file_directory = os.path.join(directory, asset_directory)
+            for name, value in element.attrib.items():
+                # Includes and assets use file, cube textures fileright, fileleft, fileup, ...
+                if name.startswith("file") and not os.path.isabs(value):
+                    element.attrib[name] = os.path.normpath(os.path.join(file_directory, value))
+        sections.append(section)
+    return sections
+
+
+# Cache shared by all environments.
+xml_parse_cache = XmlParseCache()
@@ -0,0 +1,78 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+
+from kivy.clock import Clock
+
+from planar_robotics_configurator.model.environment import Environment
+from planar_robotics_configurator.model.environment.benchmark import benchmark_environment
+from planar_robotics_configurator.view.environment.preview import PreviewIndicator
+from planar_robotics_configurator.view.utils import CustomSnackbar
+
+
+class BenchmarkWorker:
+    """
+    Runs simulation benchmarks of environments in a separate process, thus the configurator does not freeze. Every
+    benchmark runs in a new process, thus the peak memory is neither influenced by the configurator nor by previous
+    benchmarks. The result is shown in a snackbar.
+    Only one benchmark runs at a time, requests while a benchmark is running are ignored.
+    Canceling discards the result of a running benchmark.
+    """
+
+    def __init__(self, env_component, num_steps: int = 1000):
+        """
+        :param num_steps: Number of simulated steps per benchmark.
+        """
+        self.env_component = env_component
+        self.num_steps = num_steps
+        self.indicator = PreviewIndicator(self.cancel, tooltip_text="Cancel benchmark")
+        self.executor: ProcessPoolExecutor | None = None
+        self.future: Future | None = None
+
+    def request(self, environment: Environment):
+        """
+        Starts a benchmark of the current state of the environment if no benchmark is running.
+        """
+        if self.future is not None:
+            return
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                                max_tasks_per_child=1)
+        self.indicator.set_text(f"Benchmarking {environment.name}...")
+        self.show_indicator()
+        future = self.executor.submit(benchmark_environment, environment.copy(), self.num_steps)
+        self.future = future
+        future.add_done_callback(lambda f: Clock.schedule_once(partial(self.on_finished, f)))
+
+    def on_finished(self, future: Future, *args):
+        """
+        Shows the result or the error of the benchmark on the main thread.
+        """
+        if future is not self.future:
+            return
+        self.future = None
+        self.hide_indicator()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.env_component.show_preview_error(error)
+            return
+        CustomSnackbar(text=future.result().to_text()).open()
+
+    def cancel(self):
+        """
+        Cancels the running benchmark, the process finishes it but the result is discarded.
+        """
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.hide_indicator()
+
+    def show_indicator(self):
+        if self.indicator.parent is None:
+            self.env_component.indicators.add_widget(self.indicator)
+
+    def hide_indicator(self):
+        if self.indicator.parent is not None:
+            self.indicator.parent.remove_widget(self.indicator)
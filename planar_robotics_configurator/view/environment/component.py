@@ -1,8 +1,12 @@
+from kivy.metrics import dp
+from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.floatlayout import MDFloatLayout
 
 from planar_robotics_configurator.model.configurator_model import ConfiguratorModel
 from planar_robotics_configurator.model.environment import Environment
+from planar_robotics_configurator.view.environment.benchmark import BenchmarkWorker
 from planar_robotics_configurator.view.environment.map import EnvironmentMap
+from planar_robotics_configurator.view.environment.preview import PreviewWorker
 from planar_robotics_configurator.view.environment.selection import EnvironmentSelection
 from planar_robotics_configurator.view.environment.side_bar import EnvironmentSideBar
 from planar_robotics_configurator.view.utils import Component, CustomSnackbar
@@ -22,6 +26,12 @@ class EnvironmentComponent(MDFloatLayout, Component):
         self.selection: EnvironmentSelection = EnvironmentSelection(self)
         self.add_widget(self.selection)
         self.add_widget(EnvironmentSideBar(self))
+        # Stacks the indicators of running previews and benchmarks at the top middle.
+        self.indicators = MDBoxLayout(orientation="vertical", adaptive_size=True, spacing=dp(5),
+                                      pos_hint={"center_x": 0.5, "top": 0.98})
+        self.add_widget(self.indicators)
+        self.preview_worker = PreviewWorker(self)
+        self.benchmark_worker = BenchmarkWorker(self)
 
     def on_select(self, _):
         if self.environment is not None:
@@ -45,10 +55,16 @@ class EnvironmentComponent(MDFloatLayout, Component):
         if self.environment is None:
             CustomSnackbar(text="Please select an environment first!").open()
             return
-        try:
-            self.environment.create_basic_planar_robotics_env().render()
-        except Exception as e:
-            if len(e.args) > 0:
-                CustomSnackbar(text=e.args[0]).open()
-            else:
-                CustomSnackbar(text="An exception occupied while trying to create a preview rendering!").open()
+        self.preview_worker.request(self.environment)
+
+    def run_benchmark(self):
+        if self.environment is None:
+            CustomSnackbar(text="Please select an environment first!").open()
+            return
+        self.benchmark_worker.request(self.environment)
+
+    def show_preview_error(self, e: Exception):
+        if len(e.args) > 0:
+            CustomSnackbar(text=str(e.args[0])).open()
+        else:
+            CustomSnackbar(text="An exception occupied while trying to create a preview rendering!").open()
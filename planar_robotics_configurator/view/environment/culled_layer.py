@@ -0,0 +1,108 @@
+from kivy.graphics import InstructionGroup
+from kivy.graphics.instructions import Canvas
+
+
+class CulledLayer:
+    """
+    Stores the instruction groups of the drawn entities of one canvas by the id of the entities.
+    The groups are bucketed in square blocks of tiles and only the blocks intersecting the visible area are added to
+    the canvas. Thus, the number of instructions on the canvas depends on the visible area and not on the environment.
+    Every group has to provide the drawn entity as attribute entity.
+    """
+
+    def __init__(self, canvas: Canvas, block_size: int = 16):
+        """
+        :param canvas: Canvas to which the visible blocks are added.
+        :param block_size: Number of tiles in x and y direction of a block.
+        """
+        self.canvas = canvas
+        self.block_size = block_size
+        self.blocks: dict[tuple[int, int], InstructionGroup] = {}
+        self.visible_blocks: set[tuple[int, int]] = set()
+        self.groups: dict[int, tuple[InstructionGroup, tuple[int, int]]] = {}
+        # Visible area (x_min, y_min, x_max, y_max) in tile coordinate-system, None if everything is visible.
+        self.area: tuple[float, float, float, float] | None = None
+        self.shown = True
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __contains__(self, entity):
+        return id(entity) in self.groups
+
+    def get_block(self, x: float, y: float) -> (int, int):
+        """
+        Returns the block containing the position (x, y) in tile coordinate-system.
+        """
+        return int(x // self.block_size), int(y // self.block_size)
+
+    def is_block_visible(self, block: tuple[int, int]) -> bool:
+        """
+        Checks if a block is shown and intersects the visible area.
+        """
+        if not self.shown:
+            return False
+        if self.area is None:
+            return True
+        x_min, y_min, x_max, y_max = self.area
+        return (block[0] * self.block_size <= x_max and (block[0] + 1) * self.block_size >= x_min
+                and block[1] * self.block_size <= y_max and (block[1] + 1) * self.block_size >= y_min)
+
+    def add(self, group: InstructionGroup, x: float, y: float) -> None:
+        """
+        Adds the instruction group of an entity at position (x, y) in tile coordinate-system.
+        Replaces the group of the entity if the entity was already added.
+        """
+        self.remove(group.entity)
+        key = self.get_block(x, y)
+        block = self.blocks.get(key)
+        if block is None:
+            block = InstructionGroup()
+            self.blocks[key] = block
+            if self.is_block_visible(key):
+                self.canvas.add(block)
+                self.visible_blocks.add(key)
+        block.add(group)
+        self.groups[id(group.entity)] = (group, key)
+
+    def remove(self, entity) -> None:
+        """
+        Removes the instruction group of an entity if the entity was added.
+        """
+        group, key = self.groups.pop(id(entity), (None, None))
+        if group is None:
+            return
+        block = self.blocks[key]
+        block.remove(group)
+        if len(block.children) > 0:
+            return
+        del self.blocks[key]
+        if key in self.visible_blocks:
+            self.canvas.remove(block)
+            self.visible_blocks.remove(key)
+
+    def clear(self) -> None:
+        """
+        Removes all instruction groups.
+        """
+        self.canvas.clear()
+        self.blocks.clear()
+        self.visible_blocks.clear()
+        self.groups.clear()
+
+    def update_view(self, area: tuple[float, float, float, float] | None, shown: bool = True) -> None:
+        """
+        Adds the blocks which became visible to the canvas and removes the blocks which are not visible anymore.
+        :param area: Visible area (x_min, y_min, x_max, y_max) in tile coordinate-system, None if everything is visible.
+        :param shown: False if no block should be visible, e.g. because of the level of detail.
+        """
+        self.area = area
+        self.shown = shown
+        for key, block in self.blocks.items():
+            visible = self.is_block_visible(key)
+            if visible and key not in self.visible_blocks:
+                self.canvas.add(block)
+                self.visible_blocks.add(key)
+            elif not visible and key in self.visible_blocks:
+                self.canvas.remove(block)
+                self.visible_blocks.remove(key)
@@ -186,7 +186,6 @@ class EnvironmentSettingsDialog(ScrollDialog):
         """
         environment = self.environment
         environment.name = self.env_name.text
-        environment.set_size(int(self.env_width.text), int(self.env_length.text))
         environment.initial_mover_zpos = float(self.initial_mover_zpos.text)
         environment.table_height = float(self.table_height.text)
         environment.std_noise = float(self.std_noise.text)
@@ -194,6 +193,8 @@ class EnvironmentSettingsDialog(ScrollDialog):
         environment.tile_length = float(self.tiles_length.text)
         environment.tile_height = float(self.tiles_height.text)
         environment.tile_mass = float(self.tiles_mass.text)
+        # Resize after updating the tile size, thus working stations and objects are pruned with the new size.
+        environment.set_size(int(self.env_width.text), int(self.env_length.text))
         environment.min_mass = float(self.min_mass.text)
         environment.max_mass = float(self.max_mass.text)
         environment.offset = float(self.offset.text)
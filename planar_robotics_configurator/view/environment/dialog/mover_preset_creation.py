@@ -46,9 +46,9 @@ class MoverPresetCreationDialog(ScrollDialog):
         if not self.check_name():
             CustomSnackbar(text="This name is already used").open()
             return
-        ConfiguratorModel().mover_presets.append(MoverPreset(name=self.name_field.text,
-                                                             width=float(self.width_field.text),
-                                                             length=float(self.length_field.text),
-                                                             height=float(self.height_field.text),
-                                                             mass=float(self.mass_field.text)))
+        ConfiguratorModel().add_mover_preset(MoverPreset(name=self.name_field.text,
+                                                         width=float(self.width_field.text),
+                                                         length=float(self.length_field.text),
+                                                         height=float(self.height_field.text),
+                                                         mass=float(self.mass_field.text)))
         self.dismiss()
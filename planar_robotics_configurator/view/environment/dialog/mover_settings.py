@@ -112,22 +112,27 @@ class MoverSettingsDialog(MDDialog):
         Checks if the mover is valid which means that the fields of the selected mode are filled out.
         Creates or updates mover and adds the mover to the current environment and draw it.
         """
-        if self.mover is None:
-            mover = Mover(self.preset, self.mover_x, self.mover_y, None)
-        else:
-            mover = self.mover
-            self.env_map.remove_mover(mover)
+        collision_shape = None
         if self.dialog_content.circle_checkbox.active:
             if self.dialog_content.radius_field.is_empty():
                 CustomSnackbar(text="Please insert a radius").open()
                 return
-            mover.collision_shape = CircleCollisionShape(radius=float(self.dialog_content.radius_field.text))
+            collision_shape = CircleCollisionShape(radius=float(self.dialog_content.radius_field.text))
         elif self.dialog_content.box_checkbox.active:
             if self.dialog_content.width_field.is_empty() or self.dialog_content.length_field.is_empty():
                 CustomSnackbar(text="Please insert a width and length").open()
                 return
-            mover.collision_shape = BoxCollisionShape(width=float(self.dialog_content.width_field.text),
-                                                      length=float(self.dialog_content.length_field.text))
+            collision_shape = BoxCollisionShape(width=float(self.dialog_content.width_field.text),
+                                                length=float(self.dialog_content.length_field.text))
+        # The mover is removed from the map only after the fields are checked, thus it stays drawn and indexed if the
+        # dialog is dismissed after a failed check.
+        if self.mover is None:
+            mover = Mover(self.preset, self.mover_x, self.mover_y, collision_shape)
+        else:
+            mover = self.mover
+            self.env_map.remove_mover(mover)
+            if collision_shape is not None:
+                mover.collision_shape = collision_shape
         if self.mover is None:
             self.env_map.environment.movers.append(mover)
         self.env_map.draw_mover(mover)
@@ -1,8 +1,11 @@
+from collections import OrderedDict
+
 import numpy as np
+from kivy.clock import Clock
 from kivy.core.image import Image
 from kivy.core.text import Label as CoreLabel
 from kivy.core.window import Window
-from kivy.graphics import Color, Rectangle, Line
+from kivy.graphics import Color, Rectangle, Line, InstructionGroup
 from kivy.graphics.context_instructions import Scale
 from kivy.graphics.instructions import Canvas
 from kivy.graphics.texture import Texture
@@ -14,10 +17,13 @@ from kivymd.uix.widget import MDWidget
 from planar_robotics_configurator.model.environment import Environment, Mover, BoxCollisionShape, CircleCollisionShape
 from planar_robotics_configurator.model.environment.object import Object
 from planar_robotics_configurator.model.environment.working_station import WorkingStation
+from planar_robotics_configurator.view.environment.culled_layer import CulledLayer
 from planar_robotics_configurator.view.environment.dialog import (MoverSettingsDialog, WorkingStationSettings,
                                                                   ObjectSettings)
 from planar_robotics_configurator.view.environment.draw_mode import (DrawMode, TilesMode, MoverMode,
                                                                      WorkingStationMode, ObjectMode)
+from planar_robotics_configurator.view.environment.spatial_index import SpatialHash, TileIndex
+from planar_robotics_configurator.view.environment.tile_grid import TileGrid
 from planar_robotics_configurator.view.utils import CustomSnackbar
 
 
@@ -64,30 +70,93 @@ class HoverRectangle(Rectangle):
         self.y = y
 
 
-class CollisionLine(Line):
+class EntityGroup(InstructionGroup):
     """
-    Represents a line for which it is possible to store the mover.
+    Represents the instructions which draw an entity (mover, working station or object) of the environment.
+    Stores the entity, thus the instructions can be removed without searching the canvas.
     """
 
-    def __init__(self, mover, **kwargs):
-        super(CollisionLine, self).__init__(**kwargs)
-        self.mover = mover
+    def __init__(self, entity, **kwargs):
+        super(EntityGroup, self).__init__(**kwargs)
+        self.entity = entity
+
+
+class LabelTextureCache:
+    """
+    Least recently used cache of rendered label textures by (text, font size).
+    The cache is bounded by the number of textures and the number of bytes of all textures.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_entries: Maximal number of cached textures.
+        :param max_bytes: Maximal number of bytes of all cached RGBA textures.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.textures: OrderedDict[tuple[str, int], Texture] = OrderedDict()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.textures)
+
+    @staticmethod
+    def get_texture_bytes(texture: Texture) -> int:
+        """
+        Returns the number of bytes of an RGBA texture.
+        """
+        return texture.size[0] * texture.size[1] * 4
+
+    def get(self, text: str, font_size: int) -> Texture:
+        """
+        Returns the texture of the text, renders the text if it is not cached.
+        The texture is flipped vertically for the scatter coordinate-system.
+        """
+        key = (text, font_size)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            self.textures.move_to_end(key)
+            return texture
+        self.misses += 1
+        label = CoreLabel(text=text, font_size=font_size)
+        label.refresh()
+        texture = label.texture
+        texture.flip_vertical()
+        self.textures[key] = texture
+        self.num_bytes += self.get_texture_bytes(texture)
+        # Keep at least the new texture, even if it exceeds the bounds on its own.
+        while len(self.textures) > 1 and (len(self.textures) > self.max_entries or self.num_bytes > self.max_bytes):
+            _, evicted = self.textures.popitem(last=False)
+            self.num_bytes -= self.get_texture_bytes(evicted)
+        return texture
+
+    def clear(self) -> None:
+        """
+        Removes all cached textures and resets the hit and miss counts.
+        """
+        self.textures.clear()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
 
 
 class LabelRectangle(Rectangle):
     """
     Creates a text with the center at the given position.
     The size specifies the height of the text field. The width is automatically calculated to fit the height.
+    The rendered texts are shared by all labels through texture_cache.
     """
+    texture_cache = LabelTextureCache()
 
-    def __init__(self, text: str, size, pos, **kwargs):
+    def __init__(self, text: str, size, pos, font_size: int = 100, **kwargs):
         self.x = pos[0]
         self.y = pos[1]
-        label = CoreLabel(text=text, font_size=100)
-        label.refresh()
-        label.texture.flip_vertical()
-        size = (size * label.texture.size[0] / label.texture.size[1], size)
-        super(LabelRectangle, self).__init__(texture=label.texture, size=size,
+        texture = self.texture_cache.get(text, font_size)
+        size = (size * texture.size[0] / texture.size[1], size)
+        super(LabelRectangle, self).__init__(texture=texture, size=size,
                                              pos=(pos[0] - size[0] / 2, pos[1] - size[1] / 2), **kwargs)
 
 
@@ -96,7 +165,10 @@ class EnvironmentMap(MDWidget):
     Defines a map which can be moved by middle and right click and zoomed with scroll-wheel.
     Thous transformations are automatically applied to all canvas which are drawn to self.scatter.
     Draws the given environment.
+    Only the part of the environment which is visible in the map is drawn.
     """
+    # Minimal size (pixels) of a tile on the screen for drawing tiles with gaps, names and collision shapes.
+    LOD_TILE_SIZE = 8
 
     def __init__(self):
         super().__init__()
@@ -118,6 +190,15 @@ class EnvironmentMap(MDWidget):
             "objects": True,
             "objects_name": True
         }
+        # Draws all tiles with a single TileGrid. If False, every tile is drawn as a separate rectangle.
+        self.batch_tiles = True
+        self.tile_grid: TileGrid | None = None
+        # Color instruction of every tile (x, y) if the tiles are drawn as rectangles.
+        self.tile_colors: dict[tuple[int, int], Color] = {}
+        # Spatial indices of the drawn environment used for hit-testing on click and hover.
+        self.mover_index = TileIndex()
+        self.working_station_index = SpatialHash(cell_size=0.2)
+        self.object_index = SpatialHash(cell_size=0.2)
         # Kivy coordinate system to environment coordinate system
         with self.scatter.canvas.before:
             Scale(1, -1, 1)
@@ -128,11 +209,31 @@ class EnvironmentMap(MDWidget):
             self.scatter.movers_collision_canvas = Canvas()
             self.scatter.hover_rect_color = Color(0, 0, 0, 0)
             self.scatter.hover_rect = HoverRectangle(-1, -1, pos=(0, 0), size=(1, 1))
+            self.scatter.working_stations_name_canvas = Canvas()
             self.scatter.working_stations_canvas = Canvas()
+            self.scatter.objects_name_canvas = Canvas()
             self.scatter.objects_canvas = Canvas()
             self.scatter.texture_hover_rect_color = Color(0, 0, 0, 0)
             self.scatter.texture_hover_rect = Rectangle(texture=self.robot_texture, pos=(0, 0), size=(0, 0))
         self.add_widget(self.scatter)
+        # Instruction groups of the drawn entities by the entities, culled to the visible area.
+        self.movers_layer = CulledLayer(self.scatter.movers_canvas)
+        self.movers_collision_layer = CulledLayer(self.scatter.movers_collision_canvas)
+        self.working_stations_layer = CulledLayer(self.scatter.working_stations_canvas)
+        self.working_stations_name_layer = CulledLayer(self.scatter.working_stations_name_canvas)
+        self.objects_layer = CulledLayer(self.scatter.objects_canvas)
+        self.objects_name_layer = CulledLayer(self.scatter.objects_name_canvas)
+        # Update the drawn area at most once per frame on panning, zooming and resizing.
+        self.viewport_trigger = Clock.create_trigger(lambda dt: self.update_viewport())
+        self.scatter.bind(transform=lambda *args: self.viewport_trigger())
+        self.bind(pos=lambda *args: self.viewport_trigger(), size=lambda *args: self.viewport_trigger())
+        # Mouse over events are coalesced and processed at most once per frame with the latest mouse position.
+        self.mouse_pos: (float, float) | None = None
+        self.hover_trigger = Clock.create_trigger(lambda dt: self.update_hover())
+        # Hovered entity or position of the texture hover rect, used to skip unchanged hovers.
+        self.texture_hover_key = None
+        # True while a rectangle of tiles is selected, the hover rect then shows the rectangle.
+        self.tiles_rectangle = False
 
     def on_touch_down(self, touch: MotionEvent):
         if not self.collide_point(*touch.pos):
@@ -147,9 +248,7 @@ class EnvironmentMap(MDWidget):
 
             if isinstance(self.draw_mode, WorkingStationMode):
                 pos = self.screen_to_environment(*touch.pos)
-                working_station = next(filter(
-                    lambda w: self.is_close(pos, (w.position[0], w.position[1]), tolerance=0.1),
-                    self.environment.working_stations), None)
+                working_station = self.working_station_index.query(*pos, tolerance=0.1)
                 if working_station is not None:
                     WorkingStationSettings(self, working_station=working_station).open()
                     return True
@@ -157,8 +256,7 @@ class EnvironmentMap(MDWidget):
                 return True
             if isinstance(self.draw_mode, ObjectMode):
                 pos = self.screen_to_environment(*touch.pos)
-                object_instance = next(filter(lambda o: self.is_close(pos, (o.position[0], o.position[1]),
-                                                                      tolerance=0.1), self.environment.objects), None)
+                object_instance = self.object_index.query(*pos, tolerance=0.1)
                 if object_instance is not None:
                     ObjectSettings(self, object_instance=object_instance).open()
                     return True
@@ -167,15 +265,23 @@ class EnvironmentMap(MDWidget):
             pos = self.screen_to_tile_position(*touch.pos)
             if 0 <= pos[0] < self.environment.num_width and 0 <= pos[1] < self.environment.num_length:
                 # Edit mover if there is a mover.
-                mover = next(filter((lambda m: m.x == pos[0] and m.y == pos[1]), self.environment.movers), None)
+                mover = self.mover_index.get(*pos)
                 if mover is not None:
                     MoverSettingsDialog(self, pos[0], pos[1], None, mover).open()
                     return True
-                # Place/remove tile if the draw_mode is tiles.
+                # Place/remove tiles if the draw_mode is tiles. Dragging paints all tiles under the mouse,
+                # dragging while pressing shift fills the rectangle between the first and the last tile.
                 if isinstance(self.draw_mode, TilesMode):
-                    self.environment.set_tile(*pos, 1 - self.environment.get_tile(*pos))
-                    self.remove_hover_rect()
-                    self.redraw_tile(*pos)
+                    touch.grab(self)
+                    touch.ud["tiles_start"] = pos
+                    touch.ud["tiles_last"] = pos
+                    touch.ud["tiles_value"] = 1 - int(self.environment.get_tile(*pos))
+                    self.tiles_rectangle = "shift" in Window.modifiers
+                    touch.ud["tiles_rectangle"] = self.tiles_rectangle
+                    if self.tiles_rectangle:
+                        self.draw_hover_area(pos, pos, touch.ud["tiles_value"])
+                    else:
+                        self.paint_tiles([pos[0]], [pos[1]], touch.ud["tiles_value"])
                     return True
                 # Place a mover if the position is on a tile.
                 if isinstance(self.draw_mode, MoverMode):
@@ -187,24 +293,122 @@ class EnvironmentMap(MDWidget):
 
         return super().on_touch_down(touch)
 
+    def on_touch_move(self, touch: MotionEvent):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        pos = self.screen_to_tile_position(*touch.pos)
+        pos = (min(max(pos[0], 0), self.environment.num_width - 1),
+               min(max(pos[1], 0), self.environment.num_length - 1))
+        last = touch.ud["tiles_last"]
+        if pos == last:
+            return True
+        touch.ud["tiles_last"] = pos
+        if touch.ud["tiles_rectangle"]:
+            self.draw_hover_area(touch.ud["tiles_start"], pos, touch.ud["tiles_value"])
+            return True
+        # Paint the line between the last and the current tile, thus no tile is skipped on fast mouse movements.
+        num = max(abs(pos[0] - last[0]), abs(pos[1] - last[1]))
+        xs = np.rint(np.linspace(last[0], pos[0], num + 1)).astype(int)[1:]
+        ys = np.rint(np.linspace(last[1], pos[1], num + 1)).astype(int)[1:]
+        self.paint_tiles(xs, ys, touch.ud["tiles_value"])
+        return True
+
+    def on_touch_up(self, touch: MotionEvent):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        if touch.ud["tiles_rectangle"]:
+            self.tiles_rectangle = False
+            self.fill_tiles_area(touch.ud["tiles_start"], touch.ud["tiles_last"], touch.ud["tiles_value"])
+        return True
+
+    def paint_tiles(self, xs, ys, value) -> None:
+        """
+        Sets the given tiles to the value and redraws them at once.
+        Tiles on which a mover is placed are not removed.
+        :param xs: x positions of the tiles.
+        :param ys: y positions of the tiles.
+        :param value: value of the tiles, 1 for existing and 0 for not existing tile.
+        """
+        xs, ys = np.asarray(xs, dtype=int), np.asarray(ys, dtype=int)
+        if value == 0:
+            free = np.array([self.mover_index.get(x, y) is None for x, y in zip(xs, ys)], dtype=bool)
+            xs, ys = xs[free], ys[free]
+        if len(xs) == 0:
+            return
+        self.environment.set_tiles(xs, ys, value)
+        self.redraw_tiles(xs.min(), ys.min(), xs.max() + 1, ys.max() + 1)
+        self.remove_hover_rect()
+        self.hover_trigger()
+
+    def fill_tiles_area(self, start, end, value) -> None:
+        """
+        Sets all tiles in the rectangle between the start and end tile (inclusive) to the value and redraws them at
+        once. Tiles on which a mover is placed are not removed.
+        :param start: (x, y) position of the first corner tile.
+        :param end: (x, y) position of the opposite corner tile.
+        :param value: value of the tiles, 1 for existing and 0 for not existing tile.
+        """
+        x_start, x_end = min(start[0], end[0]), max(start[0], end[0]) + 1
+        y_start, y_end = min(start[1], end[1]), max(start[1], end[1]) + 1
+        self.environment.set_tiles_area(x_start, y_start, x_end, y_end, value)
+        if value == 0:
+            mover_tiles = [tile for tile in self.mover_index.tiles
+                           if x_start <= tile[0] < x_end and y_start <= tile[1] < y_end]
+            if len(mover_tiles) > 0:
+                self.environment.set_tiles([tile[0] for tile in mover_tiles], [tile[1] for tile in mover_tiles], 1)
+        self.redraw_tiles(x_start, y_start, x_end, y_end)
+        self.remove_hover_rect()
+        self.hover_trigger()
+
+    def draw_hover_area(self, start, end, value) -> None:
+        """
+        Draws the hover rect over the rectangle between the start and end tile (inclusive).
+        :param start: (x, y) position of the first corner tile.
+        :param end: (x, y) position of the opposite corner tile.
+        :param value: value to which the tiles are set, 1 for existing and 0 for not existing tile.
+        """
+        x_start, y_start = min(start[0], end[0]), min(start[1], end[1])
+        self.scatter.hover_rect.x = -1
+        self.scatter.hover_rect.y = -1
+        if value == 1:
+            # Green
+            self.scatter.hover_rect_color.rgba = (0.65, 1, 0.56, 0.6)
+        else:
+            # Red
+            self.scatter.hover_rect_color.rgba = (1, 0.45, 0.45, 0.6)
+        self.scatter.hover_rect.pos = self.tile_position_to_scatter(x_start, y_start)
+        self.scatter.hover_rect.size = self.environment_to_scatter(
+            (abs(end[0] - start[0]) + 1) * self.environment.tile_width,
+            (abs(end[1] - start[1]) + 1) * self.environment.tile_length)
+
     def on_mouse_over(self, window, pos):
         """
-        Event on mouse over. Draw hover rect if mouse is over the possible area of tiles and movers.
+        Event on mouse over. Schedules the update of the hover rect for the next frame.
         :param pos: position of mouse over, (x, y).
         """
-        if self.environment is None:
+        self.mouse_pos = pos
+        self.hover_trigger()
+
+    def update_hover(self):
+        """
+        Draw hover rect if mouse is over the possible area of tiles and movers.
+        Uses the latest mouse position since the last update.
+        """
+        if self.environment is None or self.mouse_pos is None or self.tiles_rectangle:
             return
+        pos = self.mouse_pos
         if isinstance(self.draw_mode, WorkingStationMode) or isinstance(self.draw_mode, ObjectMode):
             self.draw_texture_hover_rect(*self.screen_to_environment(*pos))
             return
-        else:
+        elif self.scatter.texture_hover_rect_color.a != 0:
             self.remove_texture_hover_rect()
 
         pos = self.screen_to_tile_position(*pos)
         if 0 <= pos[0] < self.environment.num_width and 0 <= pos[1] < self.environment.num_length:
             self.draw_hover_tile(*pos)
             return
-        else:
+        elif self.scatter.hover_rect.x != -1 or self.scatter.hover_rect_color.a != 0:
             self.remove_hover_rect()
 
     def remove_hover_rect(self):
@@ -220,6 +424,7 @@ class EnvironmentMap(MDWidget):
         Hide the hover robot to the user. Removes the color.
         """
         self.scatter.texture_hover_rect_color.a = 0
+        self.texture_hover_key = None
 
     def draw_texture_hover_rect(self, x, y):
         """
@@ -228,9 +433,9 @@ class EnvironmentMap(MDWidget):
         :param y: y position in environment coordinate system.
         """
         if isinstance(self.draw_mode, WorkingStationMode):
-            working_station = next(filter(lambda w: self.is_close((x, y), (w.position[0], w.position[1]),
-                                                                  tolerance=0.1), self.environment.working_stations),
-                                   None)
+            working_station = self.working_station_index.query(x, y, tolerance=0.1)
+            if self.is_texture_hover_unchanged(working_station, x, y):
+                return
             self.scatter.texture_hover_rect.texture = self.robot_texture
             if working_station is not None:
                 self.scatter.texture_hover_rect_color.rgba = (0, 0, 0, 0.6)
@@ -239,9 +444,9 @@ class EnvironmentMap(MDWidget):
                 self.scatter.texture_hover_rect.size = self.environment_to_scatter(0.2, 0.2)
                 return
         if isinstance(self.draw_mode, ObjectMode):
-            object_instance = next(filter(lambda o: self.is_close((x, y), (o.position[0], o.position[1]),
-                                                                  tolerance=0.1), self.environment.objects),
-                                   None)
+            object_instance = self.object_index.query(x, y, tolerance=0.1)
+            if self.is_texture_hover_unchanged(object_instance, x, y):
+                return
             self.scatter.texture_hover_rect.texture = self.object_texture
             if object_instance is not None:
                 self.scatter.texture_hover_rect_color.rgba = (0, 0, 0, 0.6)
@@ -253,6 +458,23 @@ class EnvironmentMap(MDWidget):
         self.scatter.texture_hover_rect.pos = self.environment_to_scatter(x - 0.1, y - 0.1)
         self.scatter.texture_hover_rect.size = self.environment_to_scatter(0.2, 0.2)
 
+    def is_texture_hover_unchanged(self, entity, x, y) -> bool:
+        """
+        Checks if the texture hover rect already shows the given hovered entity or the position (x, y) if no entity is
+        hovered, and stores the new hover otherwise.
+        :param entity: Hovered working station or object, None if no entity is hovered.
+        :param x: x position in environment coordinate system.
+        :param y: y position in environment coordinate system.
+        """
+        if entity is not None:
+            key = (type(self.draw_mode), id(entity), tuple(entity.position))
+        else:
+            key = (type(self.draw_mode), None, (x, y))
+        if key == self.texture_hover_key:
+            return True
+        self.texture_hover_key = key
+        return False
+
     def draw_hover_tile(self, x, y):
         """
         Draws a hover rect at position (x, y) in tile position.
@@ -264,7 +486,7 @@ class EnvironmentMap(MDWidget):
             return
         self.scatter.hover_rect.x = x
         self.scatter.hover_rect.y = y
-        mover = next(filter((lambda m: m.x == x and m.y == y), self.environment.movers), None)
+        mover = self.mover_index.get(x, y)
         if mover is not None:
             self.scatter.hover_rect_color.rgba = (0, 0, 0, 0.4)
             x_pad = (1 - (mover.preset.width / self.environment.tile_width)) / 2
@@ -326,10 +548,13 @@ class EnvironmentMap(MDWidget):
         self.remove_texture_hover_rect()
         self.scatter.tiles_background_canvas.clear()
         self.scatter.tiles_canvas.children = []
-        self.scatter.movers_canvas.clear()
-        self.scatter.movers_collision_canvas.clear()
-        self.scatter.working_stations_canvas.clear()
-        self.scatter.objects_canvas.clear()
+        self.tile_grid = None
+        self.tile_colors = {}
+        for layer in self.get_layers():
+            layer.clear()
+        self.mover_index.clear()
+        self.working_station_index.clear()
+        self.object_index.clear()
 
     def redraw(self):
         """
@@ -344,6 +569,52 @@ class EnvironmentMap(MDWidget):
         self.draw_movers()
         self.draw_working_stations()
         self.draw_objects()
+        self.update_viewport()
+
+    def get_layers(self) -> list[CulledLayer]:
+        """
+        Returns the layers of all drawn movers, working stations and objects.
+        """
+        return [self.movers_layer, self.movers_collision_layer, self.working_stations_layer,
+                self.working_stations_name_layer, self.objects_layer, self.objects_name_layer]
+
+    def get_visible_area(self) -> (float, float, float, float):
+        """
+        Returns the area of the environment visible in the map.
+        Returns:
+            (x_min, y_min, x_max, y_max) in tiles coordinate-system.
+        """
+        corners = [self.environment_to_tile_position(*self.screen_to_environment(x, y))
+                   for x, y in [(self.x, self.y), (self.right, self.y), (self.x, self.top), (self.right, self.top)]]
+        return (min(corner[0] for corner in corners), min(corner[1] for corner in corners),
+                max(corner[0] for corner in corners), max(corner[1] for corner in corners))
+
+    def is_coarse(self) -> bool:
+        """
+        Checks if the tiles are drawn smaller than LOD_TILE_SIZE on the screen.
+        """
+        tile_size = self.environment_to_scatter(self.environment.tile_width, self.environment.tile_length)
+        return min(tile_size) * self.scatter.scale < self.LOD_TILE_SIZE
+
+    def update_viewport(self) -> None:
+        """
+        Updates the drawn instructions to the visible area of the map.
+        Draws the tiles without gaps and hides names and collision shapes if the map is zoomed out (see is_coarse).
+        """
+        if self.environment is None:
+            return
+        x_min, y_min, x_max, y_max = self.get_visible_area()
+        coarse = self.is_coarse()
+        if self.tile_grid is not None:
+            self.tile_grid.update_view((x_min, y_min, x_max, y_max), coarse)
+        # Entities are drawn beyond their tile, e.g. names, thus blocks next to the visible area are drawn as well.
+        area = (x_min - 1, y_min - 1, x_max + 1, y_max + 1)
+        self.movers_layer.update_view(area)
+        self.movers_collision_layer.update_view(area, not coarse)
+        self.working_stations_layer.update_view(area)
+        self.working_stations_name_layer.update_view(area, not coarse)
+        self.objects_layer.update_view(area)
+        self.objects_name_layer.update_view(area, not coarse)
 
     def center_map(self):
         """
@@ -371,30 +642,45 @@ class EnvironmentMap(MDWidget):
             Rectangle(pos=(0, 0),
                       size=self.tile_position_to_scatter(self.environment.num_width, self.environment.num_length))
 
-    def redraw_tile(self, x, y) -> None:
+    def redraw_tiles(self, x_start, y_start, x_end, y_end) -> None:
         """
-        Removes the specified tile from the environment and draw the tile again.
+        Updates the colors of all tiles in the area [x_start, x_end) x [y_start, y_end) to their current values in
+        the environment with one update of the drawn instructions.
+        :param x_start: first x position of the area.
+        :param y_start: first y position of the area.
+        :param x_end: x position after the area.
+        :param y_end: y position after the area.
+        """
+        if self.tile_grid is not None:
+            self.tile_grid.update_tiles(x_start, y_start,
+                                        self.environment.get_tiles_area(x_start, y_start, x_end, y_end))
+            self.scatter.tiles_canvas.ask_update()
+            return
+        for x, y in np.ndindex(x_end - x_start, y_end - y_start):
+            color = self.tile_colors.get((x_start + x, y_start + y))
+            if color is not None:
+                color.rgba = self.get_tile_color(x_start + x, y_start + y)
+
+    def get_tile_color(self, x, y) -> (float, float, float, float):
+        """
+        Returns the color of the specified tile for drawing it as rectangle.
         :param x: x position of the tile.
         :param y: y position of the tile.
         """
-        pos = self.tile_position_to_scatter(x + 0.05, y + 0.05)
-        self.scatter.tiles_canvas.children[:] = [c for c in self.scatter.tiles_canvas.children
-                                                 if not (isinstance(c, Rectangle) and c.pos == pos)]
-        self.draw_tile(x, y)
+        if self.environment.get_tile(x, y) == 1:
+            return 0.49, 0.49, 0.49, 1
+        return 0.2, 0.2, 0.2, 1
 
     def draw_tile(self, x, y) -> None:
         """
-        Draws the specified tile on the environment.
+        Draws the specified tile on the environment as rectangle and stores its color in tile_colors.
         :param x: x position of the tile.
         :param y: y position of the tile.
         """
         if not self.hiding_settings["tiles"]:
             return
         with self.scatter.tiles_canvas:
-            if self.environment.get_tile(x, y) == 1:
-                Color(0.49, 0.49, 0.49, 1)
-            else:
-                Color(0.2, 0.2, 0.2, 1)
+            self.tile_colors[(x, y)] = Color(*self.get_tile_color(x, y))
             Rectangle(pos=self.tile_position_to_scatter(x + 0.05, y + 0.05),
                       size=self.environment_to_scatter(self.environment.tile_width * 0.9,
                                                        self.environment.tile_length * 0.9))
@@ -402,23 +688,28 @@ class EnvironmentMap(MDWidget):
     def draw_tiles(self) -> None:
         """
         Draws all the tiles in the environment.
+        Uses a single TileGrid if batch_tiles is set, otherwise one rectangle per tile.
         """
         self.scatter.tiles_canvas.children = []
+        self.tile_grid = None
+        self.tile_colors = {}
         if not self.hiding_settings["tiles"]:
             return
-        with self.scatter.tiles_canvas:
-            Color(0.49, 0.49, 0.49, 1)
-            for index, value in np.ndenumerate(self.environment.tiles):
-                if value == 1:
-                    Rectangle(pos=self.tile_position_to_scatter(index[0] + 0.05, index[1] + 0.05),
-                              size=self.environment_to_scatter(self.environment.tile_width * 0.9,
-                                                               self.environment.tile_length * 0.9))
-            Color(0.2, 0.2, 0.2, 1)
-            for index, value in np.ndenumerate(self.environment.tiles):
-                if value == 0:
-                    Rectangle(pos=self.tile_position_to_scatter(index[0] + 0.05, index[1] + 0.05),
-                              size=self.environment_to_scatter(self.environment.tile_width * 0.9,
-                                                               self.environment.tile_length * 0.9))
+        if self.batch_tiles:
+            self.tile_grid = TileGrid(self.environment.tiles,
+                                      self.environment_to_scatter(self.environment.tile_width,
+                                                                  self.environment.tile_length),
+                                      area=self.get_visible_area(), coarse=self.is_coarse())
+            self.scatter.tiles_canvas.add(self.tile_grid)
+            return
+        self.draw_tiles_rectangles()
+
+    def draw_tiles_rectangles(self) -> None:
+        """
+        Draws all the tiles in the environment with one rectangle per tile.
+        """
+        for x, y in np.ndindex(self.environment.tiles.shape):
+            self.draw_tile(x, y)
 
     def set_movers_mode(self, preset):
         """
@@ -456,8 +747,9 @@ class EnvironmentMap(MDWidget):
         """
         Removes all drawn movers and redraw all movers in the current environment.
         """
-        self.scatter.movers_canvas.clear()
-        self.scatter.movers_collision_canvas.clear()
+        self.movers_layer.clear()
+        self.movers_collision_layer.clear()
+        self.mover_index.clear()
         for mover in self.environment.movers:
             self.draw_mover(mover)
 
@@ -465,7 +757,9 @@ class EnvironmentMap(MDWidget):
         """
         Removes all drawn working stations and redraw all working stations in the current environment.
         """
-        self.scatter.working_stations_canvas.clear()
+        self.working_stations_layer.clear()
+        self.working_stations_name_layer.clear()
+        self.working_station_index.clear()
         for working_station in self.environment.working_stations:
             self.draw_working_station(working_station)
 
@@ -473,134 +767,134 @@ class EnvironmentMap(MDWidget):
         """
         Removes all drawn objects and redraw all objects in the current environment.
         """
-        self.scatter.objects_canvas.clear()
+        self.objects_layer.clear()
+        self.objects_name_layer.clear()
+        self.object_index.clear()
         for object_instance in self.environment.objects:
             self.draw_object(object_instance)
 
-    @staticmethod
-    def is_close(pos_1, pos_2, tolerance=0.01) -> bool:
-        """
-        Compares two positions and checks if the difference of them are below a given tolerance.
-        """
-        return abs(pos_1[0] - pos_2[0]) < tolerance and abs(pos_1[1] - pos_2[1]) < tolerance
-
     def remove_mover(self, mover: Mover) -> None:
         """
         Removes a specific mover from the map.
         :params mover: Mover which should be removed.
         """
-        x_pad = (1 - (mover.preset.width / self.environment.tile_width)) / 2
-        y_pad = (1 - (mover.preset.length / self.environment.tile_length)) / 2
-        pos = self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad)
-        x_pad = (1 - (mover.preset.width * 0.9 / self.environment.tile_width)) / 2
-        y_pad = (1 - (mover.preset.length * 0.9 / self.environment.tile_length)) / 2
-        pos_2 = self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad)
-        self.scatter.movers_canvas.children[:] = \
-            [c for c in self.scatter.movers_canvas.children
-             if not (isinstance(c, Rectangle) and (self.is_close(c.pos, pos) or self.is_close(c.pos, pos_2)))]
-
-        self.scatter.movers_collision_canvas.children[:] = \
-            [c for c in self.scatter.movers_collision_canvas.children
-             if not (isinstance(c, CollisionLine) and c.mover == mover)]
+        self.mover_index.remove(mover)
+        self.movers_layer.remove(mover)
+        self.movers_collision_layer.remove(mover)
 
     def draw_mover(self, mover: Mover) -> None:
         """
-        Draws a mover.
+        Draws a mover and adds it to the mover index. Hidden movers are added to the index as well.
+        Replaces the instructions of the mover if it is already drawn.
         :params mover: Mover object which provides the position and size of the mover.
         """
+        self.remove_mover(mover)
+        self.mover_index.insert(mover, mover.x, mover.y)
         if not self.hiding_settings["movers"]:
             return
-        with self.scatter.movers_canvas:
-            Color(0.85, 0.85, 0.85, 1)
-            x_pad = (1 - (mover.preset.width / self.environment.tile_width)) / 2
-            y_pad = (1 - (mover.preset.length / self.environment.tile_length)) / 2
-            Rectangle(pos=self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad),
-                      size=self.environment_to_scatter(mover.preset.width, mover.preset.length))
-            Color(0.98, 1, 0.87, 1)
-            x_pad = (1 - (mover.preset.width * 0.9 / self.environment.tile_width)) / 2
-            y_pad = (1 - (mover.preset.length * 0.9 / self.environment.tile_length)) / 2
-            Rectangle(pos=self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad),
-                      size=self.environment_to_scatter(mover.preset.width * 0.9, mover.preset.length * 0.9))
-        if self.hiding_settings["movers_collision"]:
-            with self.scatter.movers_collision_canvas:
-                center_pos = self.tile_position_to_environment(mover.x + 0.5, mover.y + 0.5)
-                if isinstance(mover.collision_shape, CircleCollisionShape):
-                    pos = self.environment_to_scatter(center_pos[0] - mover.collision_shape.radius,
-                                                      center_pos[1] - mover.collision_shape.radius)
-                    size = self.environment_to_scatter(mover.collision_shape.radius * 2,
-                                                       mover.collision_shape.radius * 2)
-                    Color(1, 0, 0, 1)
-                    CollisionLine(mover, ellipse=(pos[0], pos[1], size[0], size[1]))
-                if isinstance(mover.collision_shape, BoxCollisionShape):
-                    pos = self.environment_to_scatter(center_pos[0] - mover.collision_shape.width / 2,
-                                                      center_pos[1] - mover.collision_shape.length / 2)
-                    size = self.environment_to_scatter(mover.collision_shape.width, mover.collision_shape.length)
-                    Color(1, 0, 0, 1)
-                    CollisionLine(mover, rectangle=(pos[0], pos[1], size[0], size[1]))
+        group = EntityGroup(mover)
+        group.add(Color(0.85, 0.85, 0.85, 1))
+        x_pad = (1 - (mover.preset.width / self.environment.tile_width)) / 2
+        y_pad = (1 - (mover.preset.length / self.environment.tile_length)) / 2
+        group.add(Rectangle(pos=self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad),
+                            size=self.environment_to_scatter(mover.preset.width, mover.preset.length)))
+        group.add(Color(0.98, 1, 0.87, 1))
+        x_pad = (1 - (mover.preset.width * 0.9 / self.environment.tile_width)) / 2
+        y_pad = (1 - (mover.preset.length * 0.9 / self.environment.tile_length)) / 2
+        group.add(Rectangle(pos=self.tile_position_to_scatter(mover.x + x_pad, mover.y + y_pad),
+                            size=self.environment_to_scatter(mover.preset.width * 0.9, mover.preset.length * 0.9)))
+        self.movers_layer.add(group, mover.x, mover.y)
+        if not self.hiding_settings["movers_collision"]:
+            return
+        group = EntityGroup(mover)
+        center_pos = self.tile_position_to_environment(mover.x + 0.5, mover.y + 0.5)
+        if isinstance(mover.collision_shape, CircleCollisionShape):
+            pos = self.environment_to_scatter(center_pos[0] - mover.collision_shape.radius,
+                                              center_pos[1] - mover.collision_shape.radius)
+            size = self.environment_to_scatter(mover.collision_shape.radius * 2,
+                                               mover.collision_shape.radius * 2)
+            group.add(Color(1, 0, 0, 1))
+            group.add(Line(ellipse=(pos[0], pos[1], size[0], size[1])))
+        if isinstance(mover.collision_shape, BoxCollisionShape):
+            pos = self.environment_to_scatter(center_pos[0] - mover.collision_shape.width / 2,
+                                              center_pos[1] - mover.collision_shape.length / 2)
+            size = self.environment_to_scatter(mover.collision_shape.width, mover.collision_shape.length)
+            group.add(Color(1, 0, 0, 1))
+            group.add(Line(rectangle=(pos[0], pos[1], size[0], size[1])))
+        self.movers_collision_layer.add(group, mover.x, mover.y)
 
     def draw_working_station(self, working_station: WorkingStation) -> None:
         """
-        Draws a working station.
+        Draws a working station and adds it to the working station index.
+        Hidden working stations are added to the index as well.
+        Replaces the instructions of the working station if it is already drawn.
         :params working_station: WorkingStation object which should be drawn.
         """
+        self.remove_working_station(working_station)
+        self.working_station_index.insert(working_station, working_station.position[0], working_station.position[1])
         if not self.hiding_settings["working_stations"]:
             return
-        with self.scatter.working_stations_canvas:
-            if self.hiding_settings["working_stations_name"]:
-                Color(1, 1, 1, 1)
-                LabelRectangle(text=working_station.name, size=self.environment_to_scatter(0.1, 0.1)[0],
-                               pos=self.environment_to_scatter(working_station.position[0] + 0.15,
-                                                               working_station.position[1]))
-            Color(working_station.color[0], working_station.color[1], working_station.color[2],
-                  working_station.color[3])
-            Rectangle(
-                texture=self.robot_texture,
-                pos=self.environment_to_scatter(working_station.position[0] - 0.1, working_station.position[1] - 0.1),
-                size=self.environment_to_scatter(0.2, 0.2))
+        tile_position = self.environment_to_tile_position(working_station.position[0], working_station.position[1])
+        if self.hiding_settings["working_stations_name"]:
+            group = EntityGroup(working_station)
+            group.add(Color(1, 1, 1, 1))
+            group.add(LabelRectangle(text=working_station.name, size=self.environment_to_scatter(0.1, 0.1)[0],
+                                     pos=self.environment_to_scatter(working_station.position[0] + 0.15,
+                                                                     working_station.position[1])))
+            self.working_stations_name_layer.add(group, *tile_position)
+        group = EntityGroup(working_station)
+        group.add(Color(working_station.color[0], working_station.color[1], working_station.color[2],
+                        working_station.color[3]))
+        group.add(Rectangle(
+            texture=self.robot_texture,
+            pos=self.environment_to_scatter(working_station.position[0] - 0.1, working_station.position[1] - 0.1),
+            size=self.environment_to_scatter(0.2, 0.2)))
+        self.working_stations_layer.add(group, *tile_position)
 
     def remove_working_station(self, working_station: WorkingStation) -> None:
         """
         Removes a specific working station from the map.
         :params working_station: WorkingStation which should be removed.
         """
-        pos = self.environment_to_scatter(working_station.position[0] - 0.1, working_station.position[1] - 0.1)
-        pos2 = self.environment_to_scatter(working_station.position[0] + 0.15, working_station.position[1])
-        self.scatter.working_stations_canvas.children[:] = \
-            [c for c in self.scatter.working_stations_canvas.children
-             if not (isinstance(c, Rectangle) and (self.is_close(c.pos, pos)))
-             and not (isinstance(c, LabelRectangle) and self.is_close((c.x, c.y), pos2))]
+        self.working_station_index.remove(working_station)
+        self.working_stations_layer.remove(working_station)
+        self.working_stations_name_layer.remove(working_station)
 
     def draw_object(self, object_instance: Object) -> None:
         """
-        Draws a working station.
-        :params working_station: WorkingStation object which should be drawn.
+        Draws an object and adds it to the object index. Hidden objects are added to the index as well.
+        Replaces the instructions of the object if it is already drawn.
+        :params object_instance: Object which should be drawn.
         """
+        self.remove_object(object_instance)
+        self.object_index.insert(object_instance, object_instance.position[0], object_instance.position[1])
         if not self.hiding_settings["objects"]:
             return
-        with self.scatter.objects_canvas:
-            if self.hiding_settings["objects_name"]:
-                Color(1, 1, 1, 1)
-                LabelRectangle(text=object_instance.name, size=self.environment_to_scatter(0.1, 0.1)[0],
-                               pos=self.environment_to_scatter(object_instance.position[0] + 0.15,
-                                                               object_instance.position[1]))
-            Color(object_instance.color[0], object_instance.color[1], object_instance.color[2],
-                  object_instance.color[3])
-            Rectangle(
-                texture=self.object_texture,
-                pos=self.environment_to_scatter(object_instance.position[0] - 0.1, object_instance.position[1] - 0.1),
-                size=self.environment_to_scatter(0.2, 0.2))
+        tile_position = self.environment_to_tile_position(object_instance.position[0], object_instance.position[1])
+        if self.hiding_settings["objects_name"]:
+            group = EntityGroup(object_instance)
+            group.add(Color(1, 1, 1, 1))
+            group.add(LabelRectangle(text=object_instance.name, size=self.environment_to_scatter(0.1, 0.1)[0],
+                                     pos=self.environment_to_scatter(object_instance.position[0] + 0.15,
+                                                                     object_instance.position[1])))
+            self.objects_name_layer.add(group, *tile_position)
+        group = EntityGroup(object_instance)
+        group.add(Color(object_instance.color[0], object_instance.color[1], object_instance.color[2],
+                        object_instance.color[3]))
+        group.add(Rectangle(
+            texture=self.object_texture,
+            pos=self.environment_to_scatter(object_instance.position[0] - 0.1, object_instance.position[1] - 0.1),
+            size=self.environment_to_scatter(0.2, 0.2)))
+        self.objects_layer.add(group, *tile_position)
 
     def remove_object(self, object_instance: Object) -> None:
         """
-        Removes a specific working station from the map.
-        :params working_station: WorkingStation which should be removed.
+        Removes a specific object from the map.
+        :params object_instance: Object which should be removed.
         """
-        pos = self.environment_to_scatter(object_instance.position[0] - 0.1, object_instance.position[1] - 0.1)
-        pos2 = self.environment_to_scatter(object_instance.position[0] + 0.15, object_instance.position[1])
-        self.scatter.objects_canvas.children[:] = \
-            [c for c in self.scatter.objects_canvas.children
-             if not (isinstance(c, Rectangle) and (self.is_close(c.pos, pos)))
-             and not (isinstance(c, LabelRectangle) and self.is_close((c.x, c.y), pos2))]
+        self.object_index.remove(object_instance)
+        self.objects_layer.remove(object_instance)
+        self.objects_name_layer.remove(object_instance)
 
     def tile_position_to_scatter(self, x, y) -> (int, int):
         """
@@ -629,6 +923,18 @@ class EnvironmentMap(MDWidget):
         y = y * self.environment.tile_length
         return x, y
 
+    def environment_to_tile_position(self, x, y) -> (float, float):
+        """
+        Converts coordinates in environment coordinate-system to tiles coordinate-system without rounding.
+        Args:
+            x: x coordinate in environment coordinate-system.
+            y: y coordinate in environment coordinate-system.
+
+        Returns:
+            (x, y) with x, y in tiles coordinate-system.
+        """
+        return x / self.environment.tile_width, y / self.environment.tile_length
+
     def screen_to_tile_position(self, x, y) -> (int, int):
         """
         Converts coordinates in screen coordinate-system to tile coordinate-system.
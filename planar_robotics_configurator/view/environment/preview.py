@@ -0,0 +1,179 @@
+import threading
+from functools import partial
+
+import mujoco
+import mujoco.viewer
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivymd.uix.gridlayout import MDGridLayout
+from kivymd.uix.spinner import MDSpinner
+
+from planar_robotics_configurator.model.environment import Environment
+from planar_robotics_configurator.model.environment.env_cache import environment_cache
+from planar_robotics_configurator.view.utils import CustomIconButton, CustomLabel
+
+
+class PreviewIndicator(MDGridLayout):
+    """
+    Overlay at the top middle of the environment site which is shown while a preview is built or a benchmark runs.
+    Shows a spinner, the current state and a button to cancel. The indicators are stacked in
+    EnvironmentComponent.indicators, thus they do not overlap.
+    """
+
+    def __init__(self, on_cancel, tooltip_text="Cancel preview", **kwargs):
+        """
+        :param on_cancel: Called when the cancel button is released.
+        :param tooltip_text: Tooltip of the cancel button.
+        """
+        super().__init__(**kwargs)
+        self.rows = 1
+        self.md_bg_color = "#2F2F2F"
+        self.padding = [dp(10), dp(5), dp(5), dp(5)]
+        self.radius = [dp(10), dp(10), dp(10), dp(10)]
+        self.spacing = [dp(10), 0]
+        self.adaptive_size = True
+        self.pos_hint = {"center_x": 0.5}
+        self.add_widget(MDSpinner(size_hint=(None, None), size=(dp(20), dp(20)), pos_hint={"center_y": 0.5},
+                                  active=True))
+        self.label = CustomLabel(text="", pos_hint={"center_y": 0.5})
+        self.add_widget(self.label)
+        self.add_widget(CustomIconButton(icon="close",
+                                         tooltip_text=tooltip_text,
+                                         on_release=lambda touch: on_cancel()))
+
+    def set_text(self, text):
+        self.label.text = text
+
+
+class PreviewWorker:
+    """
+    Builds the simulation environments of previews on a background thread, thus the configurator does not freeze while
+    the MJCF is generated and the MuJoCo model compiled. Only the built environment is rendered on the main thread.
+    The worker builds a copy of the environment, thus it can be edited during the build. Requests while a build is
+    running are coalesced: a request for the content which is built is ignored, otherwise the latest request is built
+    after the running build.
+    A running build can not be interrupted, canceling discards its result. The built environment stays in the
+    environment cache, thus a later preview of the same content is fast. The passive MuJoCo viewer is launched by the
+    worker on the main thread, one viewer at a time.
+    """
+
+    def __init__(self, env_component):
+        self.env_component = env_component
+        self.indicator = PreviewIndicator(self.cancel)
+        self.thread: threading.Thread | None = None
+        self.content_hash: str | None = None
+        self.pending: tuple[Environment, str] | None = None
+        self.cancelled = False
+        self.viewer: mujoco.viewer.Handle | None = None
+        self.viewer_env = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def request(self, environment: Environment):
+        """
+        Requests a preview of the current state of the environment.
+        """
+        content_hash = environment.content_hash()
+        if not self.running:
+            self.start(environment.copy(), content_hash)
+            return
+        self.cancelled = False
+        self.show_indicator("Building preview...")
+        if content_hash == self.content_hash:
+            self.pending = None
+        elif self.pending is None or self.pending[1] != content_hash:
+            self.pending = (environment.copy(), content_hash)
+
+    def start(self, environment: Environment, content_hash: str):
+        """
+        Starts building the environment on a new thread.
+        """
+        self.content_hash = content_hash
+        self.cancelled = False
+        self.show_indicator("Building preview...")
+        self.thread = threading.Thread(target=self.build, args=(environment, content_hash), daemon=True)
+        self.thread.start()
+
+    def build(self, environment: Environment, content_hash: str):
+        """
+        Builds the environment, runs on the worker thread. The result is passed to on_finished on the main thread.
+        """
+        try:
+            env, evicted = environment_cache.get(environment, content_hash=content_hash)
+        except Exception as e:
+            Clock.schedule_once(partial(self.on_finished, None, [], e))
+            return
+        Clock.schedule_once(partial(self.on_finished, env, evicted, None))
+
+    def on_finished(self, env, evicted: list, error: Exception | None, *args):
+        """
+        Renders the built environment or shows the error, starts the pending request instead if there is one.
+        Closes the environments which were removed from the environment cache by the build.
+        """
+        for evicted_env in evicted:
+            if evicted_env is self.viewer_env:
+                self.close_viewer()
+            evicted_env.close()
+        self.thread = None
+        self.content_hash = None
+        if self.pending is not None:
+            environment, content_hash = self.pending
+            self.pending = None
+            self.start(environment, content_hash)
+            return
+        if self.cancelled:
+            return
+        if error is not None:
+            self.hide_indicator()
+            self.env_component.show_preview_error(error)
+            return
+        self.show_indicator("Opening viewer...")
+        # Render in the next frame, thus the state is displayed before the viewer opens.
+        Clock.schedule_once(partial(self.render, env))
+
+    def render(self, env, *args):
+        self.hide_indicator()
+        if self.cancelled:
+            return
+        try:
+            self.show_viewer(env)
+        except Exception as e:
+            self.env_component.show_preview_error(e)
+
+    def show_viewer(self, env):
+        """
+        Shows the environment in the passive MuJoCo viewer. The viewer of the environment is updated while it is open,
+        otherwise a new viewer is launched, e.g. after the user closed it. The viewer of another environment is closed.
+        """
+        if self.viewer is not None and self.viewer_env is env and self.viewer.is_running():
+            self.viewer.sync()
+            return
+        self.close_viewer()
+        mujoco.mj_forward(env.model, env.data)
+        self.viewer = mujoco.viewer.launch_passive(env.model, env.data)
+        self.viewer_env = env
+
+    def close_viewer(self):
+        if self.viewer is not None:
+            self.viewer.close()
+        self.viewer = None
+        self.viewer_env = None
+
+    def cancel(self):
+        """
+        Cancels the running and pending requests, the result of a running build is discarded.
+        """
+        self.cancelled = True
+        self.pending = None
+        self.hide_indicator()
+
+    def show_indicator(self, text):
+        self.indicator.set_text(text)
+        if self.indicator.parent is None:
+            self.env_component.indicators.add_widget(self.indicator)
+
+    def hide_indicator(self):
+        if self.indicator.parent is not None:
+            self.indicator.parent.remove_widget(self.indicator)
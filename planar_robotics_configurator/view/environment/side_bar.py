@@ -43,6 +43,9 @@ class EnvironmentSideBar(MDGridLayout):
         self.add_widget(CustomIconButton(icon="play",
                                          tooltip_text="Preview environment",
                                          on_release=lambda touch: self.env_component.show_preview()))
+        self.add_widget(CustomIconButton(icon="speedometer",
+                                         tooltip_text="Benchmark simulation",
+                                         on_release=lambda touch: self.env_component.run_benchmark()))
 
     def open_settings(self):
         """
@@ -0,0 +1,114 @@
+class SpatialHash:
+    """
+    Uniform grid which stores items at continuous 2D positions.
+    Allows finding an item close to a position by only checking the grid cells around this position.
+    Items are identified by their identity, because the model dataclasses are not hashable.
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        :param cell_size: Size of the square grid cells. Should be at least twice the tolerance of the queries.
+        """
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[tuple[object, float, float]]] = {}
+        self.item_cells: dict[int, tuple[int, int]] = {}
+
+    def __len__(self):
+        return len(self.item_cells)
+
+    def get_cell(self, x: float, y: float) -> (int, int):
+        """
+        Returns the cell containing the position (x, y).
+        """
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item, x: float, y: float) -> None:
+        """
+        Inserts an item at position (x, y). An already inserted item is moved to the new position.
+        """
+        self.remove(item)
+        cell = self.get_cell(x, y)
+        self.cells.setdefault(cell, []).append((item, x, y))
+        self.item_cells[id(item)] = cell
+
+    def remove(self, item) -> None:
+        """
+        Removes an item. Uses the position at which the item was inserted, thus the item may have been moved since.
+        """
+        cell = self.item_cells.pop(id(item), None)
+        if cell is None:
+            return
+        entries = self.cells[cell]
+        entries[:] = [entry for entry in entries if entry[0] is not item]
+        if len(entries) == 0:
+            del self.cells[cell]
+
+    def clear(self) -> None:
+        """
+        Removes all items.
+        """
+        self.cells.clear()
+        self.item_cells.clear()
+
+    def query(self, x: float, y: float, tolerance: float):
+        """
+        Returns the closest item of which the x and y differences to the position (x, y) are below the tolerance.
+        Returns None if there is no such item.
+        """
+        min_x, min_y = self.get_cell(x - tolerance, y - tolerance)
+        max_x, max_y = self.get_cell(x + tolerance, y + tolerance)
+        closest, closest_distance = None, None
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for item, item_x, item_y in self.cells.get((cell_x, cell_y), ()):
+                    if abs(item_x - x) >= tolerance or abs(item_y - y) >= tolerance:
+                        continue
+                    distance = (item_x - x) ** 2 + (item_y - y) ** 2
+                    if closest_distance is None or distance < closest_distance:
+                        closest, closest_distance = item, distance
+        return closest
+
+
+class TileIndex:
+    """
+    Stores items by the tile on which they are placed. Each tile holds at most one item.
+    """
+
+    def __init__(self):
+        self.tiles: dict[tuple[int, int], object] = {}
+        self.item_tiles: dict[int, tuple[int, int]] = {}
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def insert(self, item, x, y) -> None:
+        """
+        Stores an item at tile (x, y). An already inserted item is moved to the new tile.
+        """
+        self.remove(item)
+        tile = (int(x), int(y))
+        self.remove(self.tiles.get(tile))
+        self.tiles[tile] = item
+        self.item_tiles[id(item)] = tile
+
+    def remove(self, item) -> None:
+        """
+        Removes an item. Uses the tile at which the item was inserted, thus the item may have been moved since.
+        """
+        tile = self.item_tiles.pop(id(item), None)
+        if tile is None:
+            return
+        del self.tiles[tile]
+
+    def clear(self) -> None:
+        """
+        Removes all items.
+        """
+        self.tiles.clear()
+        self.item_tiles.clear()
+
+    def get(self, x, y):
+        """
+        Returns the item at tile (x, y) or None if there is no item.
+        """
+        return self.tiles.get((int(x), int(y)))
@@ -0,0 +1,135 @@
+import numpy as np
+from kivy.graphics import Color, InstructionGroup, Mesh, Rectangle
+from kivy.graphics.texture import Texture
+
+
+class TileGrid(InstructionGroup):
+    """
+    Draws all tiles of an environment at once instead of one rectangle per tile.
+    The color of each tile is stored as a single pixel of a texture and every tile is a textured quad of a mesh.
+    The quads are split into meshes of BLOCK_SIZE x BLOCK_SIZE tiles, because a mesh is limited to 65535 vertices.
+    Only the meshes of the visible blocks are created and added. In coarse mode, the texture is drawn as a single
+    rectangle over the whole grid without gaps between the tiles.
+    Columns of the grid are the y-axis and rows are the x-axis of the tile coordinate-system.
+    """
+    BLOCK_SIZE = 64
+    # RGBA colors of not existing (0) and existing (1) tiles.
+    TILE_COLORS = np.array([[51, 51, 51, 255], [125, 125, 125, 255]], dtype=np.uint8)
+    # Two triangles per quad, vertices ordered counterclockwise.
+    QUAD_INDICES = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint16)
+
+    def __init__(self, tiles: np.ndarray, cell_size, gap: float = 0.05, area=None, coarse=False, **kwargs):
+        """
+        :param tiles: [num_width, num_length] array of the tiles, 1 for existing tiles and 0 else.
+        :param cell_size: (width, height) of a tile in scatter coordinate-system.
+        :param gap: Gap between a tile and the border of its cell relative to the cell size.
+        :param area: Visible area, see update_view.
+        :param coarse: Draw the grid in coarse mode, see update_view.
+        """
+        super().__init__(**kwargs)
+        self.num_rows, self.num_cols = tiles.shape
+        self.cell_size = cell_size
+        self.gap = gap
+        self.texture = Texture.create(size=(max(self.num_cols, 1), max(self.num_rows, 1)), colorfmt="rgba")
+        self.texture.mag_filter = "nearest"
+        self.texture.min_filter = "nearest"
+        self.blit_tiles(tiles)
+        self.blocks: dict[tuple[int, int], InstructionGroup] = {}
+        # Kivy uses the vertex and index buffers in place, thus they have to be kept alive.
+        self.buffers: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+        self.visible_blocks: set[tuple[int, int]] = set()
+        self.coarse_rectangle = Rectangle(texture=self.texture, pos=(0, 0),
+                                          size=(self.num_cols * cell_size[0], self.num_rows * cell_size[1]))
+        self.coarse = False
+        self.add(Color(1, 1, 1, 1))
+        self.update_view(area, coarse)
+
+    def update_view(self, area=None, coarse=False) -> None:
+        """
+        Adds the blocks which became visible and removes the blocks which are not visible anymore.
+        :param area: Visible area (x_min, y_min, x_max, y_max) in tile coordinate-system, None if the whole grid is
+        visible.
+        :param coarse: If True, the grid is drawn as a single rectangle without gaps between the tiles.
+        """
+        if coarse != self.coarse:
+            if coarse:
+                self.add(self.coarse_rectangle)
+            else:
+                self.remove(self.coarse_rectangle)
+            self.coarse = coarse
+        visible_blocks = set() if coarse else self.get_blocks(area)
+        for key in self.visible_blocks - visible_blocks:
+            self.remove(self.blocks[key])
+        for key in visible_blocks - self.visible_blocks:
+            if key not in self.blocks:
+                self.blocks[key] = self.create_block(key)
+            self.add(self.blocks[key])
+        self.visible_blocks = visible_blocks
+
+    def get_blocks(self, area) -> set[tuple[int, int]]:
+        """
+        Returns the blocks (block_row, block_col) of the grid which intersect the given area.
+        :param area: Area (x_min, y_min, x_max, y_max) in tile coordinate-system, None for the whole grid.
+        """
+        num_block_rows = -(-self.num_rows // self.BLOCK_SIZE)
+        num_block_cols = -(-self.num_cols // self.BLOCK_SIZE)
+        if area is None:
+            return {(row, col) for row in range(num_block_rows) for col in range(num_block_cols)}
+        x_min, y_min, x_max, y_max = area
+        rows = range(max(0, int(x_min // self.BLOCK_SIZE)), min(num_block_rows, int(x_max // self.BLOCK_SIZE) + 1))
+        cols = range(max(0, int(y_min // self.BLOCK_SIZE)), min(num_block_cols, int(y_max // self.BLOCK_SIZE) + 1))
+        return {(row, col) for row in rows for col in cols}
+
+    def blit_tiles(self, tiles: np.ndarray) -> None:
+        """
+        Writes the colors of all tiles into the texture.
+        :param tiles: [num_width, num_length] array of the tiles.
+        """
+        self.update_tiles(0, 0, tiles)
+
+    def update_tiles(self, x, y, tiles: np.ndarray) -> None:
+        """
+        Updates the colors of an area of tiles by writing the corresponding sub-region of the texture at once.
+        The canvas containing the grid has to be updated afterward.
+        :param x: x position of the first tile of the area.
+        :param y: y position of the first tile of the area.
+        :param tiles: [width, length] array of the tiles in the area.
+        """
+        if tiles.size == 0:
+            return
+        pixels = np.ascontiguousarray(self.TILE_COLORS[tiles.astype(np.intp)])
+        self.texture.blit_buffer(pixels.reshape(-1), size=(tiles.shape[1], tiles.shape[0]), colorfmt="rgba",
+                                 bufferfmt="ubyte", pos=(y, x))
+
+    def create_block(self, key: tuple[int, int]) -> InstructionGroup:
+        """
+        Creates a mesh containing one quad for each tile in the given block.
+        All vertices of a quad sample the center of the tile pixel, thus the quad has the color of the tile.
+        :param key: (block_row, block_col) of the block.
+        """
+        row_start, col_start = key[0] * self.BLOCK_SIZE, key[1] * self.BLOCK_SIZE
+        row_end = min(row_start + self.BLOCK_SIZE, self.num_rows)
+        col_end = min(col_start + self.BLOCK_SIZE, self.num_cols)
+        rows, cols = np.mgrid[row_start:row_end, col_start:col_end]
+        rows = rows.reshape(-1).astype(np.float32)
+        cols = cols.reshape(-1).astype(np.float32)
+        cell_width, cell_height = self.cell_size
+        x_0 = (cols + self.gap) * cell_width
+        x_1 = (cols + 1 - self.gap) * cell_width
+        y_0 = (rows + self.gap) * cell_height
+        y_1 = (rows + 1 - self.gap) * cell_height
+        u = (cols + 0.5) / self.num_cols * self.texture.uvsize[0]
+        v = (rows + 0.5) / self.num_rows * self.texture.uvsize[1]
+        vertices = np.empty((len(rows), 4, 4), dtype=np.float32)
+        vertices[:, :, 2] = u[:, None]
+        vertices[:, :, 3] = v[:, None]
+        vertices[:, 0, 0], vertices[:, 0, 1] = x_0, y_0
+        vertices[:, 1, 0], vertices[:, 1, 1] = x_1, y_0
+        vertices[:, 2, 0], vertices[:, 2, 1] = x_1, y_1
+        vertices[:, 3, 0], vertices[:, 3, 1] = x_0, y_1
+        vertices = vertices.reshape(-1)
+        indices = (np.arange(len(rows), dtype=np.uint16)[:, None] * 4 + self.QUAD_INDICES).reshape(-1)
+        self.buffers[key] = (vertices, indices)
+        block = InstructionGroup()
+        block.add(Mesh(vertices=vertices, indices=indices, mode="triangles", texture=self.texture))
+        return block
@@ -11,6 +11,8 @@ from kivymd.uix.widget import MDWidget
 from plyer import filechooser
 
 from planar_robotics_configurator.model.configurator_model import ConfiguratorModel
+from planar_robotics_configurator.model.environment.snapshot import save_snapshot
+from planar_robotics_configurator.model.environment.tiles_codec import TILES_ENCODINGS
 from planar_robotics_configurator.view.utils import CustomIconButton, NonEmptyTextField, CustomLabel, CustomSnackbar
 
 
@@ -27,6 +29,7 @@ class ExportContainer(MDBoxLayout):
         self.spacing = dp(15)
         self.selected_algo_config = None
         self.selected_env = None
+        self.tiles_encoding = "plain"
 
         self.algo_dropdown_item = MDDropDownItem(pos_hint={'center_y': 0.5})
         self.algo_dropdown_item.set_item("None")
@@ -68,10 +71,22 @@ class ExportContainer(MDBoxLayout):
         self.env_file_selection_button = CustomIconButton(icon="folder", pos_hint={"center_y": 0.5},
                                                           tooltip_text="Select file",
                                                           on_release=lambda _: self.open_file_selection(
-                                                              self.env_file_name))
+                                                              self.env_file_name, [".yaml", ".npz"]))
         env_file_layout.add_widget(self.env_file_selection_button)
         self.add_widget(env_file_layout)
 
+        self.tiles_encoding_dropdown_item = MDDropDownItem(pos_hint={'center_y': 0.5})
+        self.tiles_encoding_dropdown_item.set_item(self.tiles_encoding)
+        tiles_encoding_dropdown_menu = MDDropdownMenu(position='bottom', caller=self.tiles_encoding_dropdown_item)
+        self.tiles_encoding_dropdown_item.bind(
+            on_release=lambda *args: self.open_tiles_encoding_dropdown_menu(tiles_encoding_dropdown_menu,
+                                                                            self.tiles_encoding_dropdown_item))
+        self.add_widget(MDBoxLayout(
+            CustomLabel(text="Tiles Encoding", pos_hint={'center_y': 0.5}),
+            MDWidget(),
+            self.tiles_encoding_dropdown_item,
+            orientation="horizontal", size_hint_x=1, adaptive_height=True, spacing=dp(10)))
+
         self.add_widget(MDFlatButton(text="Export", pos_hint={'center_x': 0.5}, size_hint=(0.5, None),
                                      theme_text_color="Custom", text_color=(0, 0, 0, 1), md_bg_color=(1, 1, 1, 1),
                                      on_release=lambda _: self.on_export()))
@@ -109,14 +124,19 @@ class ExportContainer(MDBoxLayout):
         else:
             info["algo"] = "Algorithm configuration export disabled."
         if self.selected_env is not None:
-            config = {
-                "env": self.selected_env.to_config()
-            }
             path = self.env_file_name.text
             if os.path.exists(path):
                 os.remove(path)
-            with open(path, "w") as f:
-                f.write(to_yaml(config))
+            if path.endswith(".npz"):
+                # Binary snapshot, see planar_robotics_configurator.model.environment.snapshot
+                with open(path, "wb") as f:
+                    save_snapshot(f, self.selected_env.to_config(self.tiles_encoding))
+            else:
+                config = {
+                    "env": self.selected_env.to_config(self.tiles_encoding)
+                }
+                with open(path, "w") as f:
+                    f.write(to_yaml(config))
             info["env"] = "Successfully exported environment."
         else:
             info["env"] = "Environment export disabled."
@@ -187,16 +207,39 @@ class ExportContainer(MDBoxLayout):
         self.selected_env = env
         menu.dismiss()
 
-    def open_file_selection(self, field: MDTextField):
+    def open_tiles_encoding_dropdown_menu(self, menu, item):
+        """
+        Opens a dropdown menu item with all encodings of the exported tiles.
+        """
+        menu.items = []
+        for encoding in TILES_ENCODINGS:
+            menu.items.append({
+                "text": encoding,
+                "on_release": lambda val=encoding: self.on_tiles_encoding_select(menu, item, val)
+            })
+        menu.open()
+
+    def on_tiles_encoding_select(self, menu, item, encoding):
+        """
+        Called when the user selects a tiles encoding in the dropdown menu.
+        """
+        self.tiles_encoding = encoding
+        item.set_item(encoding)
+        menu.dismiss()
+
+    def open_file_selection(self, field: MDTextField, extensions=None):
         """
         Opens a file chooser.
         Sets the selected file as text of the field.
         :param field: Field of which the text should be the file path.
+        :param extensions: Allowed file extensions, the first one is appended to files without allowed extension.
+        Defaults to [".yaml"].
         """
-        res = filechooser.save_file(title="Select file", filters=["*.yaml"])
+        extensions = extensions if extensions is not None else [".yaml"]
+        res = filechooser.save_file(title="Select file", filters=[f"*{extension}" for extension in extensions])
         if res is None or len(res) == 0:
             return
-        field.text = res[0] if res[0].endswith(".yaml") else res[0] + ".yaml"
+        field.text = res[0] if res[0].endswith(tuple(extensions)) else res[0] + extensions[0]
 
     def reset(self):
         """
@@ -10,6 +10,7 @@ from plyer import filechooser
 from planar_robotics_configurator.model.algorithm.algorithm_configuration import AlgorithmConfiguration
 from planar_robotics_configurator.model.configurator_model import ConfiguratorModel
 from planar_robotics_configurator.model.environment import Environment
+from planar_robotics_configurator.model.environment.snapshot import load_snapshot_environment
 from planar_robotics_configurator.view.utils import NonEmptyTextField, CustomIconButton, CustomLabel, CustomCheckbox, \
     CustomSnackbar
 
@@ -74,7 +75,7 @@ class ImportContainer(MDBoxLayout):
         self.env_file_selection_button = CustomIconButton(icon="folder", pos_hint={"center_y": 0.5},
                                                           tooltip_text="Select file",
                                                           on_release=lambda _: self.open_file_selection(
-                                                              self.env_file_name))
+                                                              self.env_file_name, [".yaml", ".npz"]))
         env_file_layout.add_widget(self.env_file_selection_button)
         self.add_widget(env_file_layout)
 
@@ -145,9 +146,13 @@ class ImportContainer(MDBoxLayout):
         if self.env_checkbox.active:
             file_name = self.env_file_name.text
             try:
-                config = hydra_zen.load_from_yaml(file_name)
-                ConfiguratorModel().environments.append(
-                    Environment.from_config(self.environment_name.text, config["env"]))
+                if file_name.endswith(".npz"):
+                    # Binary snapshot, the tiles are read when the environment is opened.
+                    environment = load_snapshot_environment(self.environment_name.text, file_name)
+                else:
+                    config = hydra_zen.load_from_yaml(file_name)
+                    environment = Environment.from_config(self.environment_name.text, config["env"])
+                ConfiguratorModel().environments.append(environment)
                 info["env"] = "Successfully imported environment configuration."
             except FileNotFoundError:
                 info["env"] = "Failed importing environment. File with name {file_name} not found."
@@ -158,12 +163,14 @@ class ImportContainer(MDBoxLayout):
             info["env"] = "Environment import disabled."
         CustomSnackbar(f"{info['algo']}\n{info['env']}").open()
 
-    def open_file_selection(self, field: MDTextField):
+    def open_file_selection(self, field: MDTextField, extensions=None):
         """
         Opens a file chooser and stores the selected file in the given field.
         :param field: MDTextField instance of which the text should be changed.
+        :param extensions: Allowed file extensions. Defaults to [".yaml"].
         """
-        res = filechooser.open_file(title="Select file", filters=["*.yaml"])
+        extensions = extensions if extensions is not None else [".yaml"]
+        res = filechooser.open_file(title="Select file", filters=[f"*{extension}" for extension in extensions])
         if res is None or len(res) == 0:
             return
         field.text = res[0]